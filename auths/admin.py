@@ -81,7 +81,7 @@ class UserAdmin(BaseUserAdmin):
     
     def has_technicien_profile(self, obj):
         """Vérifie si l'utilisateur a un profil technicien"""
-        return hasattr(obj, 'technicien_profile')
+        return getattr(obj, 'technicien_profile', None) is not None
     has_technicien_profile.short_description = 'Profil Technicien'
     has_technicien_profile.boolean = True
 
@@ -0,0 +1,33 @@
+# backends.py
+"""
+Backends d'authentification pour les utilisateurs
+"""
+from django.contrib.auth.backends import ModelBackend
+
+from .models import User
+
+
+class LoginModelBackend(ModelBackend):
+    """
+    ModelBackend qui ne charge que les colonnes nécessaires à la connexion
+    (sans master_key_hash, two_factor_secret, avatar...)
+    """
+    login_fields = (
+        'id', 'email', 'username', 'first_name', 'last_name', 'password',
+        'is_active', 'failed_login_attempts', 'locked_until', 'two_factor_enabled',
+    )
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = User._default_manager.only(*self.login_fields).filter_by_email(username).get()
+        except (User.DoesNotExist, User.MultipleObjectsReturned):
+            # Hachage factice pour ne pas révéler l'existence du compte (timing)
+            User().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError
 import os
 
 User = get_user_model()
@@ -21,15 +22,8 @@ class Command(BaseCommand):
             )
             return
 
-        # Vérifier si l'utilisateur existe déjà
-        if User.objects.filter(username=username).exists():
-            self.stdout.write(
-                self.style.WARNING(f'L\'utilisateur "{username}" existe déjà.')
-            )
-            return
-
         try:
-            # Créer le superutilisateur
+            # Créer le superutilisateur (les contraintes d'unicité détectent un doublon)
             User.objects.create_superuser(
                 username=username,
                 email=email,
@@ -40,6 +34,10 @@ class Command(BaseCommand):
                     f'Superutilisateur "{username}" créé avec succès !'
                 )
             )
+        except IntegrityError:
+            self.stdout.write(
+                self.style.WARNING(f'L\'utilisateur "{username}" existe déjà.')
+            )
         except Exception as e:
             self.stdout.write(
                 self.style.ERROR(f'Erreur lors de la création : {e}')
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.6 on 2026-10-15 22:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('auths', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='user',
+            name='auth_user_email_ece7f7_idx',
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('locked_until__isnull', False)), fields=['locked_until'], name='user_locked_until_idx'),
+        ),
+    ]
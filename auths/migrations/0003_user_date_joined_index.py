@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-15 22:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('auths', '0002_user_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['-date_joined'], name='auth_user_date_jo_bfa7a7_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.6 on 2026-10-15 22:31
+
+import hashlib
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def copy_backup_codes(apps, schema_editor):
+    User = apps.get_model('auths', 'User')
+    UserBackupCode = apps.get_model('auths', 'UserBackupCode')
+    objs = [
+        UserBackupCode(user_id=user_id, code_hash=hashlib.sha256(str(code).encode()).hexdigest())
+        for user_id, codes in User.objects.exclude(legacy_backup_codes=[]).values_list('id', 'legacy_backup_codes')
+        for code in set(codes or [])
+    ]
+    UserBackupCode.objects.bulk_create(objs, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auths', '0004_user_lower_email'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='user',
+            old_name='backup_codes',
+            new_name='legacy_backup_codes',
+        ),
+        migrations.CreateModel(
+            name='UserBackupCode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code_hash', models.CharField(max_length=64)),
+                ('used_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='backup_codes', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Backup code',
+                'verbose_name_plural': 'Backup codes',
+                'constraints': [models.UniqueConstraint(fields=('user', 'code_hash'), name='unique_user_backup_code')],
+            },
+        ),
+        migrations.RunPython(copy_backup_codes, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='user',
+            name='legacy_backup_codes',
+        ),
+    ]
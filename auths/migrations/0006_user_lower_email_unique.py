@@ -0,0 +1,42 @@
+# Generated by Django 5.2.6 on 2026-10-15 22:56
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_duplicate_emails(apps, schema_editor):
+    User = apps.get_model('auths', 'User')
+    duplicates = list(
+        User.objects.annotate(email_lower=Lower('email'))
+        .values('email_lower')
+        .annotate(total=Count('id'))
+        .filter(total__gt=1)
+        .values_list('email_lower', flat=True)
+    )
+    if duplicates:
+        raise RuntimeError(
+            "Emails en double (casse ignorée), à fusionner avant la migration : "
+            + ", ".join(duplicates)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('auths', '0005_user_backup_code'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='user',
+            name='user_lower_email_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), name='user_lower_email_unique'),
+        ),
+    ]
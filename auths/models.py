@@ -1,7 +1,13 @@
-from django.contrib.auth.models import AbstractUser
-from django.db import models
-from django.utils.translation import gettext_lazy as _
+import hashlib
+import secrets
+
+from django.contrib.auth.models import AbstractUser, UserManager as DjangoUserManager
+from django.db import models, transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
 from django.utils import timezone
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
 class TimestampedModel(models.Model):
     """
     Modèle abstrait pour ajouter des champs de timestamp
@@ -13,6 +19,25 @@ class TimestampedModel(models.Model):
         abstract = True
 
 
+class UserQuerySet(models.QuerySet):
+    """QuerySet des utilisateurs"""
+
+    def filter_by_email(self, email):
+        """Filtre sur l'email sans tenir compte de la casse (utilise l'index LOWER(email))"""
+        return self.alias(email_lower=Lower('email')).filter(email_lower=(email or '').lower())
+
+
+class UserManager(DjangoUserManager.from_queryset(UserQuerySet)):
+    """Manager qui stocke et recherche les emails en minuscules"""
+
+    @classmethod
+    def normalize_email(cls, email):
+        return super().normalize_email(email).lower()
+
+    def get_by_natural_key(self, username):
+        return self.filter_by_email(username).get()
+
+
 class User(AbstractUser, TimestampedModel):
     """
     Modèle utilisateur personnalisé qui étend AbstractUser
@@ -33,7 +58,7 @@ class User(AbstractUser, TimestampedModel):
     # Sécurité 2FA
     two_factor_enabled = models.BooleanField(default=False)
     two_factor_secret = models.CharField(max_length=32, blank=True)
-    backup_codes = models.JSONField(default=list, blank=True)
+    # Codes de secours : voir UserBackupCode
     
     # Sécurité compte
     master_key_hash = models.CharField(max_length=255, blank=True)
@@ -42,6 +67,8 @@ class User(AbstractUser, TimestampedModel):
     failed_login_attempts = models.PositiveIntegerField(default=0)
     locked_until = models.DateTimeField(null=True, blank=True)
 
+    objects = UserManager()
+
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
 
@@ -50,23 +77,82 @@ class User(AbstractUser, TimestampedModel):
         verbose_name = _('User')
         verbose_name_plural = _('Users')
         indexes = [
-            models.Index(fields=['email']),
+            # email est déjà indexé par sa contrainte unique
             models.Index(fields=['created_at']),
+            models.Index(fields=['-date_joined']),
+            models.Index(
+                fields=['locked_until'],
+                name='user_locked_until_idx',
+                condition=Q(locked_until__isnull=False),
+            ),
+        ]
+        constraints = [
+            # Unicité sans tenir compte de la casse (sert aussi d'index à filter_by_email)
+            models.UniqueConstraint(Lower('email'), name='user_lower_email_unique'),
         ]
 
     def __str__(self):
         return f"{self.email}"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Invalide les claims JWT si l'email ou le nom a pu changer
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'email', 'username'} & set(update_fields):
+            self.__dict__.pop('jwt_public_claims', None)
+
     @property
     def full_name(self):
         """Retourne le nom complet de l'utilisateur"""
-        return f"{self.username}".strip()
+        return self.username
+
+    @cached_property
+    def jwt_public_claims(self):
+        """Claims publics ajoutés aux tokens JWT"""
+        return {'email': self.email, 'full_name': self.full_name}
 
     def get_short_name(self):
         """Retourne le prénom de l'utilisateur"""
         return self.username
-    def save(self, *args, **kwargs):
-        if self._state.adding:
-            self.created_at = timezone.now()
-        super().save(*args, **kwargs)
-    
+
+
+class UserBackupCode(models.Model):
+    """Code de secours 2FA (stocké haché, chargé uniquement à la demande)"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='backup_codes')
+    code_hash = models.CharField(max_length=64)
+    used_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('Backup code')
+        verbose_name_plural = _('Backup codes')
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'code_hash'], name='unique_user_backup_code'),
+        ]
+
+    def __str__(self):
+        return f"Code de secours de {self.user}"
+
+    @staticmethod
+    def hash_code(code):
+        """Retourne l'empreinte SHA-256 d'un code de secours"""
+        return hashlib.sha256(code.encode()).hexdigest()
+
+    @classmethod
+    def regenerate(cls, user, count=10):
+        """Remplace les codes de secours de l'utilisateur et retourne les codes en clair"""
+        codes = [secrets.token_hex(5) for _ in range(count)]
+        with transaction.atomic():
+            cls.objects.filter(user=user).delete()
+            cls.objects.bulk_create(
+                [cls(user=user, code_hash=cls.hash_code(code)) for code in codes],
+                batch_size=500,
+            )
+        return codes
+
+    @classmethod
+    def consume(cls, user, code):
+        """Marque le code comme utilisé s'il est valide (un seul UPDATE, usage unique)"""
+        return cls.objects.filter(
+            user=user, code_hash=cls.hash_code(code.strip()), used_at__isnull=True
+        ).update(used_at=timezone.now()) == 1
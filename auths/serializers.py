@@ -1,15 +1,11 @@
 from rest_framework import serializers
-from django.contrib.auth import get_user_model
+from rest_framework.validators import UniqueValidator
 
 from base.models import AppSettings
 from .models import User
-from rest_framework import serializers
-from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
-User = get_user_model()
-
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     """Serializer personnalisé pour JWT avec informations utilisateur"""
@@ -19,8 +15,8 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         token = super().get_token(user)
         
         # Ajouter des informations personnalisées au token
-        token['email'] = user.email
-        token['full_name'] = user.full_name
+        for key, value in user.jwt_public_claims.items():
+            token[key] = value
         #token['is_verified'] = user.is_verified
         
         return token
@@ -71,6 +67,9 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
             'username', 'email', 'first_name', 'last_name',
             'password', 'password_confirm', 'phone'
         )
+        extra_kwargs = {
+            'email': {'validators': [UniqueValidator(queryset=User.objects.all(), lookup='iexact')]},
+        }
 
     def validate(self, attrs):
         if attrs['password'] != attrs['password_confirm']:
@@ -91,6 +90,7 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
 class UserProfileSerializer(serializers.ModelSerializer):
     """Serializer pour le profil utilisateur"""
     full_name = serializers.ReadOnlyField()
+    avatar = serializers.SerializerMethodField()
 
     class Meta:
         model = User
@@ -101,6 +101,10 @@ class UserProfileSerializer(serializers.ModelSerializer):
         )
         read_only_fields = ('id', 'email', 'date_joined', 'last_login')
 
+    def get_avatar(self, obj):
+        """Retourne la clé de stockage de l'avatar (sans appel au backend de stockage)"""
+        return obj.avatar.name if obj.avatar else None
+
 
 class UserUpdateSerializer(serializers.ModelSerializer):
     """Serializer pour la mise à jour du profil utilisateur"""
@@ -135,20 +139,19 @@ class PasswordChangeSerializer(serializers.Serializer):
     def save(self, **kwargs):
         user = self.context['request'].user
         user.set_password(self.validated_data['new_password'])
-        user.save()
+        user.save(update_fields=['password'])
         return user
 
 
+class BackupCodeVerifySerializer(serializers.Serializer):
+    """Serializer pour la vérification d'un code de secours 2FA"""
+    code = serializers.CharField(max_length=32)
+
+
 class PasswordResetRequestSerializer(serializers.Serializer):
     """Serializer pour la demande de réinitialisation de mot de passe"""
     email = serializers.EmailField()
 
-    def validate_email(self, value):
-        if not User.objects.filter(email=value).exists():
-            raise serializers.ValidationError(
-                "Aucun utilisateur avec cette adresse email n'existe."
-            )
-        return value
 
 class UserSerializer(serializers.ModelSerializer):
     """Serializer for the User model"""
@@ -158,7 +161,8 @@ class UserSerializer(serializers.ModelSerializer):
                   'is_active', 'date_joined', 'created_at', 'updated_at', 'full_name')
         read_only_fields = ('created_at', 'updated_at', 'date_joined')
         extra_kwargs = {
-            'password': {'write_only': True, 'min_length': 8}
+            'password': {'write_only': True, 'min_length': 8},
+            'email': {'validators': [UniqueValidator(queryset=User.objects.all(), lookup='iexact')]},
         }
 
     def create(self, validated_data):
@@ -0,0 +1,27 @@
+# tasks.py
+"""
+Tâches asynchrones de l'application auths
+"""
+from celery import shared_task
+from django.contrib.auth.tokens import default_token_generator
+from django.core.mail import send_mail
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from .models import User
+
+
+@shared_task
+def send_password_reset_email(email):
+    """Envoie l'email de réinitialisation si un compte correspond à l'adresse"""
+    user = User.objects.only('id', 'email', 'password', 'last_login').filter_by_email(email).first()
+    if user is None:
+        return
+    uid = urlsafe_base64_encode(force_bytes(user.pk))
+    token = default_token_generator.make_token(user)
+    send_mail(
+        "Réinitialisation de votre mot de passe",
+        f"Utilisez ces informations pour réinitialiser votre mot de passe :\nuid={uid}\ntoken={token}",
+        None,
+        [user.email],
+    )
@@ -1,3 +1,115 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import User
+from .serializers import UserSerializer
+from .views import AuthViewSet, _send_password_reset_email_safely
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class LoginTests(TestCase):
+    """Tests de la connexion JWT"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='alice', email='alice@example.com', password='S3cure-pass!'
+        )
+
+    def test_login_returns_tokens_with_public_claims(self):
+        response = self.client.post(
+            '/api/auth/login/',
+            {'email': 'Alice@Example.com', 'password': 'S3cure-pass!'},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('refresh', response.data)
+        access = AccessToken(response.data['access'])
+        self.assertEqual(access['email'], 'alice@example.com')
+        self.assertEqual(access['full_name'], 'alice')
+
+    def test_login_rejects_wrong_password(self):
+        response = self.client.post(
+            '/api/auth/login/',
+            {'email': 'alice@example.com', 'password': 'wrong'},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 401)
+
+
+class PasswordResetRequestTests(TestCase):
+    """Tests de la demande de réinitialisation du mot de passe"""
+
+    def setUp(self):
+        User.objects.create_user(username='alice', email='alice@example.com', password='S3cure-pass!')
+        self.view = AuthViewSet.as_view({'post': 'request_password_reset'})
+
+    def _post(self, email):
+        request = APIRequestFactory().post('/', {'email': email}, format='json')
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.view(request)
+
+    @override_settings(CELERY_BROKER_URL='')
+    def test_request_does_no_lookup_whether_account_exists_or_not(self):
+        with mock.patch('auths.views.threading.Thread') as thread, self.assertNumQueries(0):
+            known = self._post('alice@example.com')
+            unknown = self._post('nobody@example.com')
+        self.assertEqual(known.status_code, 200)
+        self.assertEqual(known.data, unknown.data)
+        self.assertEqual(thread.call_count, 2)
+        self.assertEqual(thread.call_args.kwargs['args'], ('nobody@example.com',))
+        self.assertEqual(len(mail.outbox), 0)
+
+    @override_settings(CELERY_BROKER_URL='memory://')
+    def test_uses_celery_when_broker_configured(self):
+        with mock.patch('auths.views.send_password_reset_email.delay') as delay:
+            self._post('alice@example.com')
+        delay.assert_called_once_with('alice@example.com')
+
+    def test_background_send_mails_existing_accounts_only(self):
+        _send_password_reset_email_safely('nobody@example.com')
+        _send_password_reset_email_safely('Alice@example.com')
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_background_send_swallows_mail_errors(self):
+        with mock.patch('auths.tasks.send_mail', side_effect=OSError), self.assertLogs('auths.views'):
+            _send_password_reset_email_safely('alice@example.com')
+
+
+class CaseInsensitiveEmailTests(TestCase):
+    """Tests de l'unicité des emails sans tenir compte de la casse"""
+
+    def test_serializer_rejects_email_differing_only_by_case(self):
+        User.objects.create_user(username='alice', email='alice@example.com', password='S3cure-pass!')
+        serializer = UserSerializer(data={'email': 'Alice@Example.com', 'username': 'alice2'})
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('email', serializer.errors)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class BackupCodeTests(TestCase):
+    """Tests des codes de secours 2FA"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create_user(username='alice', email='alice@example.com', password='x')
+        )
+
+    def _verify(self, code):
+        return self.client.post('/api/auth/users/backup-codes/verify/', {'code': code}, format='json')
+
+    def test_regenerated_code_can_be_used_once(self):
+        codes = self.client.post('/api/auth/users/backup-codes/').data['codes']
+        self.assertEqual(len(codes), 10)
+        self.assertEqual(self._verify(codes[0]).status_code, 200)
+        self.assertEqual(self._verify(codes[0]).status_code, 400)
+
+    def test_regenerate_invalidates_previous_codes(self):
+        old = self.client.post('/api/auth/users/backup-codes/').data['codes']
+        self.client.post('/api/auth/users/backup-codes/')
+        self.assertEqual(self._verify(old[0]).status_code, 400)
@@ -1,11 +1,17 @@
+import logging
+import threading
+
+from django.conf import settings
+from django.db import transaction
 from rest_framework import viewsets, permissions
 from rest_framework.response import Response
-from django.contrib.auth import get_user_model
-from .serializers import UserSerializer
+from .models import User, UserBackupCode
+from .serializers import BackupCodeVerifySerializer, UserSerializer
 from rest_framework import status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
+from rest_framework.filters import OrderingFilter
 from rest_framework.mixins import CreateModelMixin, RetrieveModelMixin, UpdateModelMixin
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from drf_spectacular.utils import extend_schema, extend_schema_view
@@ -18,8 +24,31 @@ from .serializers import (
     PasswordChangeSerializer,
     PasswordResetRequestSerializer
 )
+from .tasks import send_password_reset_email
+
+logger = logging.getLogger(__name__)
+
+
+def _send_password_reset_email_safely(email):
+    """Envoie l'email de réinitialisation sans propager les erreurs d'envoi"""
+    try:
+        send_password_reset_email(email)
+    except Exception:
+        logger.exception("Échec de l'envoi de l'email de réinitialisation")
 
-User = get_user_model()
+
+def _dispatch_password_reset_email(email):
+    """
+    Confie l'envoi au worker Celery, ou à un thread si aucun broker n'est
+    configuré : la requête ne fait ni recherche du compte ni envoi SMTP
+    """
+    if settings.CELERY_BROKER_URL:
+        try:
+            send_password_reset_email.delay(email)
+            return
+        except Exception:
+            logger.exception("Broker Celery indisponible, envoi dans un thread")
+    threading.Thread(target=_send_password_reset_email_safely, args=(email,), daemon=True).start()
 
 
 class CustomTokenObtainPairView(TokenObtainPairView):
@@ -113,8 +142,10 @@ class AuthViewSet(CreateModelMixin, RetrieveModelMixin, UpdateModelMixin, Generi
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        # Ici vous pouvez ajouter la logique d'envoi d'email
-        # Par exemple avec Celery pour l'envoi asynchrone
+        # Recherche du compte et envoi hors de la requête : même réponse, et même
+        # durée, que l'adresse existe ou non
+        email = serializer.validated_data['email']
+        transaction.on_commit(lambda: _dispatch_password_reset_email(email))
         
         return Response(
             {'message': 'Email de réinitialisation envoyé'},
@@ -131,8 +162,6 @@ class AuthViewSet(CreateModelMixin, RetrieveModelMixin, UpdateModelMixin, Generi
         serializer = UserProfileSerializer(request.user)
         return Response(serializer.data)
 
-User = get_user_model()
-
 class UserViewSet(viewsets.ModelViewSet):
     """
     API endpoint for Users
@@ -140,5 +169,47 @@ class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # La pagination par défaut du projet (PageNumberPagination) s'applique
+    filter_backends = [OrderingFilter]
+    ordering_fields = ['email', 'date_joined', 'created_at']
+    ordering = ['email']
+
+    def get_queryset(self):
+        """Limite les colonnes chargées aux champs du serializer pour la liste"""
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            queryset = queryset.only(
+                'id', 'email', 'username', 'first_name', 'last_name',
+                'is_active', 'date_joined', 'created_at', 'updated_at'
+            )
+        return queryset
 
+    @extend_schema(
+        summary="Régénérer les codes de secours",
+        description="Remplace les codes de secours 2FA ; les codes en clair ne sont renvoyés qu'une fois",
+        request=None,
+    )
+    @action(detail=False, methods=['post'], url_path='backup-codes')
+    def regenerate_backup_codes(self, request):
+        """Remplace les codes de secours de l'utilisateur connecté"""
+        codes = UserBackupCode.regenerate(request.user)
+        return Response({'codes': codes}, status=status.HTTP_201_CREATED)
 
+    @extend_schema(
+        summary="Utiliser un code de secours",
+        description="Vérifie un code de secours 2FA et le marque comme utilisé"
+    )
+    @action(
+        detail=False, methods=['post'], url_path='backup-codes/verify',
+        serializer_class=BackupCodeVerifySerializer,
+    )
+    def verify_backup_code(self, request):
+        """Vérifie (et consomme) un code de secours de l'utilisateur connecté"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        if not UserBackupCode.consume(request.user, serializer.validated_data['code']):
+            return Response(
+                {'message': 'Code de secours invalide ou déjà utilisé'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response({'message': 'Code de secours valide'}, status=status.HTTP_200_OK)
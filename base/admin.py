@@ -1,4 +1,6 @@
 from django.contrib import admin
+from django.db.models import F
+from django.utils import timezone
 from .models import AppSettings
 
 
@@ -34,6 +36,8 @@ class AppSettingsAdmin(admin.ModelAdmin):
         'user__last_name'
     ]
     
+    list_select_related = ['user']
+    
     readonly_fields = ['created_at', 'updated_at']
     
     fieldsets = (
@@ -76,19 +80,20 @@ class AppSettingsAdmin(admin.ModelAdmin):
     
     def reset_to_default_settings(self, request, queryset):
         """Réinitialise les paramètres aux valeurs par défaut"""
-        updated = 0
-        for settings in queryset:
-            settings.theme = AppSettings.ThemeChoices.SYSTEM
-            settings.auto_lock_timeout = AppSettings.TimeoutChoices.THIRTY_MIN
-            settings.clipboard_clear_timeout = AppSettings.ClipboardTimeoutChoices.THIRTY_SEC
-            settings.enable_biometric = False
-            settings.show_password_strength = True
-            settings.auto_fill_enabled = True
-            settings.breach_monitoring = True
-            settings.login_notifications = True
-            settings.export_format = AppSettings.ExportFormatChoices.CSV
-            settings.save()
-            updated += 1
+        updated = queryset.update(
+            theme=AppSettings.ThemeChoices.SYSTEM,
+            auto_lock_timeout=AppSettings.TimeoutChoices.THIRTY_MIN,
+            clipboard_clear_timeout=AppSettings.ClipboardTimeoutChoices.THIRTY_SEC,
+            enable_biometric=False,
+            show_password_strength=True,
+            auto_fill_enabled=True,
+            breach_monitoring=True,
+            login_notifications=True,
+            export_format=AppSettings.ExportFormatChoices.CSV,
+            version=F('version') + 1,
+            # update() contourne auto_now
+            updated_at=timezone.now(),
+        )
         
         self.message_user(
             request,
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-15 22:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appsettings',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -1,5 +1,5 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.utils import timezone
 import uuid
 from django.contrib.auth import get_user_model
@@ -54,6 +54,9 @@ class AppSettings(models.Model):
     # Export
     export_format = models.CharField(max_length=10, choices=ExportFormatChoices.choices, default=ExportFormatChoices.CSV)
     
+    # Incrémenté à chaque modification (contrôle de concurrence via If-Match)
+    version = models.PositiveIntegerField(default=0)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -62,4 +65,29 @@ class AppSettings(models.Model):
         verbose_name_plural = 'Paramètres Applications'
     
     def __str__(self):
-        return f"Paramètres de {self.user.email}"
\ No newline at end of file
+        return f"Paramètres de {self.user.email}"
+    
+    def save(self, *args, **kwargs):
+        bump_version = not self._state.adding
+        if bump_version:
+            # Incrément atomique en base : pas de perte lors de sauvegardes concurrentes
+            self.version = models.F('version') + 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'version'}
+        super().save(*args, **kwargs)
+        if bump_version:
+            self.refresh_from_db(fields=['version'])
+    
+    @classmethod
+    def get_for_user(cls, user):
+        """Récupère les paramètres de l'utilisateur, créés au besoin (retourne (settings, created))"""
+        settings = cls.objects.select_related('user').filter(user=user).first()
+        if settings is not None:
+            return settings, False
+        try:
+            with transaction.atomic():
+                return cls.objects.create(user=user), True
+        except IntegrityError:
+            # Créés entre-temps par une requête concurrente
+            return cls.objects.select_related('user').get(user=user), False
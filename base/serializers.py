@@ -4,6 +4,14 @@ from .models import AppSettings
 
 User = get_user_model()
 
+# Labels des choix, indexés par valeur
+DISPLAY_LABELS = {
+    'theme': dict(AppSettings.ThemeChoices.choices),
+    'auto_lock_timeout': dict(AppSettings.TimeoutChoices.choices),
+    'clipboard_clear_timeout': dict(AppSettings.ClipboardTimeoutChoices.choices),
+    'export_format': dict(AppSettings.ExportFormatChoices.choices),
+}
+
 
 class AppSettingsSerializer(serializers.ModelSerializer):
     """Serializer pour les paramètres d'application"""
@@ -12,27 +20,18 @@ class AppSettingsSerializer(serializers.ModelSerializer):
     user_email = serializers.CharField(source='user.email', read_only=True)
     user_username = serializers.CharField(source='user.username', read_only=True)
     
-    # Affichage des labels pour les choix
-    theme_display = serializers.CharField(source='get_theme_display', read_only=True)
-    auto_lock_timeout_display = serializers.CharField(source='get_auto_lock_timeout_display', read_only=True)
-    clipboard_clear_timeout_display = serializers.CharField(source='get_clipboard_clear_timeout_display', read_only=True)
-    export_format_display = serializers.CharField(source='get_export_format_display', read_only=True)
-    
     class Meta:
         model = AppSettings
-        fields = [
+        fields = (
             'id',
             'user',
             'user_email',
             'user_username',
             # Apparence
             'theme',
-            'theme_display',
             # Sécurité
             'auto_lock_timeout',
-            'auto_lock_timeout_display',
             'clipboard_clear_timeout',
-            'clipboard_clear_timeout_display',
             'enable_biometric',
             # Interface
             'show_password_strength',
@@ -42,48 +41,20 @@ class AppSettingsSerializer(serializers.ModelSerializer):
             'login_notifications',
             # Export
             'export_format',
-            'export_format_display',
             # Métadonnées
+            'version',
             'created_at',
             'updated_at'
-        ]
-        read_only_fields = ['id', 'user', 'created_at', 'updated_at']
-    
-    def validate_auto_lock_timeout(self, value):
-        """Validation du délai de verrouillage automatique"""
-        valid_values = [choice[0] for choice in AppSettings.TimeoutChoices.choices]
-        if value not in valid_values:
-            raise serializers.ValidationError(
-                f"Valeur invalide. Choisissez parmi: {valid_values}"
-            )
-        return value
-    
-    def validate_clipboard_clear_timeout(self, value):
-        """Validation du délai d'effacement du presse-papiers"""
-        valid_values = [choice[0] for choice in AppSettings.ClipboardTimeoutChoices.choices]
-        if value not in valid_values:
-            raise serializers.ValidationError(
-                f"Valeur invalide. Choisissez parmi: {valid_values}"
-            )
-        return value
-    
-    def validate_theme(self, value):
-        """Validation du thème"""
-        valid_values = [choice[0] for choice in AppSettings.ThemeChoices.choices]
-        if value not in valid_values:
-            raise serializers.ValidationError(
-                f"Valeur invalide. Choisissez parmi: {valid_values}"
-            )
-        return value
-    
-    def validate_export_format(self, value):
-        """Validation du format d'export"""
-        valid_values = [choice[0] for choice in AppSettings.ExportFormatChoices.choices]
-        if value not in valid_values:
-            raise serializers.ValidationError(
-                f"Valeur invalide. Choisissez parmi: {valid_values}"
-            )
-        return value
+        )
+        read_only_fields = ('id', 'user', 'version', 'created_at', 'updated_at')
+        # Les choix sont déjà validés par les ChoiceField générés depuis le modèle
+    
+    def to_representation(self, instance):
+        """Ajoute les labels des choix (`<champ>_display`) depuis des tables précalculées"""
+        data = super().to_representation(instance)
+        for field, labels in DISPLAY_LABELS.items():
+            data[f'{field}_display'] = labels.get(getattr(instance, field))
+        return data
 
 
 class AppSettingsUpdateSerializer(serializers.ModelSerializer):
@@ -91,7 +62,7 @@ class AppSettingsUpdateSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = AppSettings
-        fields = [
+        fields = (
             'theme',
             'auto_lock_timeout',
             'clipboard_clear_timeout',
@@ -101,7 +72,7 @@ class AppSettingsUpdateSerializer(serializers.ModelSerializer):
             'breach_monitoring',
             'login_notifications',
             'export_format'
-        ]
+        )
     
     def validate(self, attrs):
         """Validation globale"""
@@ -113,25 +84,17 @@ class AppSettingsUpdateSerializer(serializers.ModelSerializer):
         return attrs
 
 
-class AppSettingsChoicesSerializer(serializers.Serializer):
-    """Serializer pour retourner les choix disponibles"""
-    
-    theme_choices = serializers.SerializerMethodField()
-    timeout_choices = serializers.SerializerMethodField()
-    clipboard_timeout_choices = serializers.SerializerMethodField()
-    export_format_choices = serializers.SerializerMethodField()
-    
-    def get_theme_choices(self, obj):
-        return [{'value': choice[0], 'label': choice[1]} for choice in AppSettings.ThemeChoices.choices]
-    
-    def get_timeout_choices(self, obj):
-        return [{'value': choice[0], 'label': choice[1]} for choice in AppSettings.TimeoutChoices.choices]
-    
-    def get_clipboard_timeout_choices(self, obj):
-        return [{'value': choice[0], 'label': choice[1]} for choice in AppSettings.ClipboardTimeoutChoices.choices]
-    
-    def get_export_format_choices(self, obj):
-        return [{'value': choice[0], 'label': choice[1]} for choice in AppSettings.ExportFormatChoices.choices]
+def _choices_list(choices):
+    return [{'value': value, 'label': label} for value, label in choices]
+
+
+# Les choix sont statiques : le payload est construit une seule fois à l'import
+CHOICES_PAYLOAD = {
+    'theme_choices': _choices_list(AppSettings.ThemeChoices.choices),
+    'timeout_choices': _choices_list(AppSettings.TimeoutChoices.choices),
+    'clipboard_timeout_choices': _choices_list(AppSettings.ClipboardTimeoutChoices.choices),
+    'export_format_choices': _choices_list(AppSettings.ExportFormatChoices.choices),
+}
 
 
 class AppSettingsCreateSerializer(serializers.ModelSerializer):
@@ -139,7 +102,7 @@ class AppSettingsCreateSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = AppSettings
-        fields = [
+        fields = (
             'user',
             'theme',
             'auto_lock_timeout',
@@ -150,7 +113,7 @@ class AppSettingsCreateSerializer(serializers.ModelSerializer):
             'breach_monitoring',
             'login_notifications',
             'export_format'
-        ]
+        )
     
     def create(self, validated_data):
         """Création avec l'utilisateur courant si non spécifié"""
@@ -1,3 +1,93 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from auths.models import User
+from .models import AppSettings
+
+
+class AppSettingsTests(TestCase):
+    """Tests des paramètres d'application"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', email='alice@example.com', password='x')
+
+    def test_get_for_user_recovers_from_concurrent_creation(self):
+        existing = AppSettings.objects.create(user=self.user)
+        # La lecture initiale ne voit pas la ligne créée par une autre requête
+        with mock.patch.object(QuerySet, 'first', return_value=None):
+            settings, created = AppSettings.get_for_user(self.user)
+        self.assertFalse(created)
+        self.assertEqual(settings.pk, existing.pk)
+
+    def test_save_increments_version_in_database(self):
+        settings = AppSettings.objects.create(user=self.user)
+        stale = AppSettings.objects.get(pk=settings.pk)
+        settings.theme = AppSettings.ThemeChoices.DARK
+        settings.save()
+        stale.save(update_fields=['auto_lock_timeout'])
+        self.assertEqual(settings.version + 1, stale.version)
+        self.assertEqual(AppSettings.objects.get(pk=settings.pk).version, stale.version)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ResetToDefaultTests(TestCase):
+    """Tests de la réinitialisation des paramètres"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', email='alice@example.com', password='x')
+        self.settings = AppSettings.objects.create(user=self.user, theme=AppSettings.ThemeChoices.DARK)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_reset_restores_defaults(self):
+        response = self.client.post(f'/api/settings/settings/{self.settings.pk}/reset_to_default/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['data']['theme'], AppSettings.ThemeChoices.SYSTEM)
+
+    def test_non_numeric_pk_returns_404(self):
+        response = self.client.post('/api/settings/settings/abc/reset_to_default/')
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class UserSettingsIfMatchTests(TestCase):
+    """Tests de la mise à jour conditionnelle (If-Match) des paramètres"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', email='alice@example.com', password='x')
+        self.settings = AppSettings.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _patch(self, if_match):
+        return self.client.patch(
+            '/api/settings/me/', {'theme': AppSettings.ThemeChoices.DARK},
+            format='json', HTTP_IF_MATCH=if_match,
+        )
+
+    def test_matching_version_updates(self):
+        response = self._patch(f'"{self.settings.version}"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], f'"{self.settings.version + 1}"')
+
+    def test_weak_etag_is_compared_without_prefix(self):
+        self.assertEqual(self._patch(f'W/"{self.settings.version}"').status_code, 200)
+
+    def test_wildcard_matches_any_version(self):
+        self.assertEqual(self._patch('*').status_code, 200)
+
+    def test_stale_version_conflicts(self):
+        self.assertEqual(self._patch(f'"{self.settings.version + 5}"').status_code, 409)
+        self.settings.refresh_from_db()
+        self.assertEqual(self.settings.theme, AppSettings.ThemeChoices.SYSTEM)
+
+    def test_wildcard_without_settings_conflicts(self):
+        self.settings.delete()
+        self.assertEqual(self._patch('*').status_code, 409)
+        self.assertFalse(AppSettings.objects.filter(user=self.user).exists())
+
+    def test_malformed_header_is_rejected(self):
+        self.assertEqual(self._patch('"abc"').status_code, 400)
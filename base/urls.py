@@ -1,9 +1,9 @@
 from django.urls import path, include
-from rest_framework.routers import DefaultRouter
+from rest_framework.routers import SimpleRouter
 from . import views
 
 # Configuration du router pour le ViewSet
-router = DefaultRouter()
+router = SimpleRouter()
 router.register(r'settings', views.AppSettingsViewSet, basename='appsettings')
 
 urlpatterns = [
@@ -16,12 +16,7 @@ urlpatterns = [
     # GET          /api/settings/my_settings/      - Mes paramètres
     path('', include(router.urls)),
     
-    # ===== APPROCHE 2: Vues génériques individuelles =====
-    # Alternative si vous ne voulez pas utiliser le ViewSet
-    path('', views.AppSettingsListCreateView.as_view(), name='settings-list-create'),
-    path('<int:pk>/', views.AppSettingsRetrieveUpdateDestroyView.as_view(), name='settings-detail'),
-    
-    # ===== APPROCHE 3: Endpoints spécialisés pour l'utilisateur courant =====
+    # ===== APPROCHE 2: Endpoints spécialisés pour l'utilisateur courant =====
     # Recommandé pour une interface utilisateur simple
     path('me/', views.UserSettingsView.as_view(), name='user-settings'),
     path('me/bulk-update/', views.AppSettingsBulkUpdateView.as_view(), name='user-settings-bulk'),
@@ -1,24 +1,82 @@
-from rest_framework import generics, status, permissions, viewsets
+from rest_framework import status, permissions, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.utils import timezone
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.http import Http404, HttpResponse, HttpResponseNotModified
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
-from django.db import transaction
+import hashlib
+import json
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
 
 from .models import AppSettings
 from .serializers import (
     AppSettingsSerializer,
     AppSettingsUpdateSerializer,
-    AppSettingsChoicesSerializer,
-    AppSettingsCreateSerializer
+    AppSettingsCreateSerializer,
+    CHOICES_PAYLOAD
 )
 
 User = get_user_model()
 
+# Réponse des choix sérialisée une seule fois (contourne les renderers DRF)
+CHOICES_JSON = json.dumps(CHOICES_PAYLOAD, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+CHOICES_ETAG = f'"{hashlib.md5(CHOICES_JSON).hexdigest()}"'
 
-class AppSettingsViewSet(viewsets.ModelViewSet):
+
+def choices_response(request):
+    """Retourne le JSON précalculé des choix, ou 304 si le client l'a déjà"""
+    if request.headers.get('If-None-Match') == CHOICES_ETAG:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(CHOICES_JSON, content_type='application/json')
+    response['ETag'] = CHOICES_ETAG
+    return response
+
+
+def parse_if_match_versions(header):
+    """
+    Versions acceptées par un en-tête If-Match : None pour « * » (toute version),
+    sinon l'ensemble des versions listées, préfixe faible W/ ignoré.
+    Lève ValueError si une étiquette n'est pas un numéro de version
+    """
+    header = header.strip()
+    if header == '*':
+        return None
+    return {
+        int(tag.strip().removeprefix('W/').strip('"'))
+        for tag in header.split(',')
+    }
+
+
+# Colonnes lues par AppSettingsSerializer (seuls email et username de l'utilisateur)
+SETTINGS_ONLY_FIELDS = (
+    'id', 'user_id', 'user__email', 'user__username',
+    'theme', 'auto_lock_timeout', 'clipboard_clear_timeout', 'enable_biometric',
+    'show_password_strength', 'auto_fill_enabled', 'breach_monitoring',
+    'login_notifications', 'export_format', 'version', 'created_at', 'updated_at',
+)
+
+# Champs modifiables via la mise à jour en lot
+BULK_UPDATE_FIELDS = frozenset(AppSettingsUpdateSerializer.Meta.fields)
+
+
+class UserSettingsMixin:
+    """Mémorise les paramètres de l'utilisateur courant pour la durée de la requête"""
+    
+    def get_user_settings(self):
+        """Retourne (settings, created) sans requête supplémentaire après le premier appel"""
+        request = self.request
+        if not hasattr(request, '_app_settings'):
+            request._app_settings = AppSettings.get_for_user(request.user)
+        return request._app_settings
+
+
+class AppSettingsViewSet(UserSettingsMixin, viewsets.ModelViewSet):
     """
     ViewSet complet pour la gestion des paramètres d'application
     Permet CRUD + actions personnalisées
@@ -26,10 +84,14 @@ class AppSettingsViewSet(viewsets.ModelViewSet):
     
     serializer_class = AppSettingsSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # Clé primaire entière : un identifiant non numérique renvoie 404 dès le routage
+    lookup_value_regex = r'\d+'
     
     def get_queryset(self):
         """L'utilisateur ne voit que ses propres paramètres"""
-        return AppSettings.objects.filter(user=self.request.user)
+        return AppSettings.objects.select_related('user').only(
+            *SETTINGS_ONLY_FIELDS
+        ).filter(user=self.request.user)
     
     def get_serializer_class(self):
         """Choix du serializer selon l'action"""
@@ -43,28 +105,33 @@ class AppSettingsViewSet(viewsets.ModelViewSet):
         """Création avec l'utilisateur courant"""
         serializer.save(user=self.request.user)
     
+    @method_decorator(cache_control(max_age=3600, public=True))
     @action(detail=False, methods=['get'])
     def choices(self, request):
         """Retourne les choix disponibles pour les champs"""
-        serializer = AppSettingsChoicesSerializer({})
-        return Response(serializer.data)
+        return choices_response(request)
     
     @action(detail=True, methods=['post'])
     def reset_to_default(self, request, pk=None):
         """Réinitialise les paramètres aux valeurs par défaut"""
-        settings = self.get_object()
-        
-        with transaction.atomic():
-            settings.theme = AppSettings.ThemeChoices.SYSTEM
-            settings.auto_lock_timeout = AppSettings.TimeoutChoices.THIRTY_MIN
-            settings.clipboard_clear_timeout = AppSettings.ClipboardTimeoutChoices.THIRTY_SEC
-            settings.enable_biometric = False
-            settings.show_password_strength = True
-            settings.auto_fill_enabled = True
-            settings.breach_monitoring = True
-            settings.login_notifications = True
-            settings.export_format = AppSettings.ExportFormatChoices.CSV
-            settings.save()
+        # Un seul UPDATE, le filtre sur l'utilisateur garantit la propriété
+        updated = AppSettings.objects.filter(pk=pk, user=request.user).update(
+            theme=AppSettings.ThemeChoices.SYSTEM,
+            auto_lock_timeout=AppSettings.TimeoutChoices.THIRTY_MIN,
+            clipboard_clear_timeout=AppSettings.ClipboardTimeoutChoices.THIRTY_SEC,
+            enable_biometric=False,
+            show_password_strength=True,
+            auto_fill_enabled=True,
+            breach_monitoring=True,
+            login_notifications=True,
+            export_format=AppSettings.ExportFormatChoices.CSV,
+            version=F('version') + 1,
+            # update() contourne auto_now
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            raise Http404
+        settings = self.get_queryset().get(pk=pk)
         
         serializer = self.get_serializer(settings)
         return Response(
@@ -78,7 +145,7 @@ class AppSettingsViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def my_settings(self, request):
         """Récupère les paramètres de l'utilisateur courant"""
-        settings, created = AppSettings.objects.get_or_create(user=request.user)
+        settings, created = self.get_user_settings()
         serializer = self.get_serializer(settings)
         
         response_data = serializer.data
@@ -88,47 +155,14 @@ class AppSettingsViewSet(viewsets.ModelViewSet):
         return Response(response_data)
 
 
-class AppSettingsListCreateView(generics.ListCreateAPIView):
-    """Vue pour lister et créer les paramètres (alternative au ViewSet)"""
-    
-    serializer_class = AppSettingsSerializer
-    permission_classes = [permissions.IsAuthenticated]
-    
-    def get_queryset(self):
-        return AppSettings.objects.filter(user=self.request.user)
-    
-    def get_serializer_class(self):
-        if self.request.method == 'POST':
-            return AppSettingsCreateSerializer
-        return AppSettingsSerializer
-    
-    def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
-
-
-class AppSettingsRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
-    """Vue pour récupérer, modifier et supprimer les paramètres"""
-    
-    serializer_class = AppSettingsSerializer
-    permission_classes = [permissions.IsAuthenticated]
-    
-    def get_queryset(self):
-        return AppSettings.objects.filter(user=self.request.user)
-    
-    def get_serializer_class(self):
-        if self.request.method in ['PUT', 'PATCH']:
-            return AppSettingsUpdateSerializer
-        return AppSettingsSerializer
-
-
-class UserSettingsView(APIView):
+class UserSettingsView(UserSettingsMixin, APIView):
     """Vue spécialisée pour les paramètres de l'utilisateur courant"""
     
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
         """Récupère ou crée les paramètres de l'utilisateur"""
-        settings, created = AppSettings.objects.get_or_create(user=request.user)
+        settings, created = self.get_user_settings()
         serializer = AppSettingsSerializer(settings)
         
         response_data = {
@@ -140,27 +174,61 @@ class UserSettingsView(APIView):
     
     def put(self, request):
         """Mise à jour complète des paramètres"""
-        settings, created = AppSettings.objects.get_or_create(user=request.user)
-        serializer = AppSettingsUpdateSerializer(settings, data=request.data)
-        
-        if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        return self._update(request, partial=False)
     
     def patch(self, request):
         """Mise à jour partielle des paramètres"""
-        settings, created = AppSettings.objects.get_or_create(user=request.user)
-        serializer = AppSettingsUpdateSerializer(
-            settings, 
-            data=request.data, 
-            partial=True
-        )
+        return self._update(request, partial=True)
+    
+    def _update(self, request, partial):
+        """
+        Mise à jour en un seul UPDATE. Si le client envoie If-Match avec la
+        version connue, une modification concurrente renvoie 409 (« * » exige
+        seulement que les paramètres existent)
+        """
+        serializer = AppSettingsUpdateSerializer(data=request.data, partial=partial)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
-        if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        queryset = AppSettings.objects.filter(user=request.user)
+        if_match = request.headers.get('If-Match')
+        if if_match is not None:
+            try:
+                expected_versions = parse_if_match_versions(if_match)
+            except ValueError:
+                return Response(
+                    {'message': 'En-tête If-Match invalide'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if expected_versions is not None:
+                queryset = queryset.filter(version__in=expected_versions)
+        
+        update_values = {
+            **serializer.validated_data,
+            'version': F('version') + 1,
+            # update() contourne auto_now
+            'updated_at': timezone.now(),
+        }
+        updated = queryset.update(**update_values)
+        if updated:
+            settings = AppSettings.objects.get(user=request.user)
+        elif if_match is not None:
+            return Response(
+                {'message': 'Les paramètres ont été modifiés entre-temps'},
+                status=status.HTTP_409_CONFLICT
+            )
+        else:
+            try:
+                with transaction.atomic():
+                    settings = AppSettings.objects.create(user=request.user, **serializer.validated_data)
+            except IntegrityError:
+                # Créés entre-temps par une requête concurrente : on applique la mise à jour
+                AppSettings.objects.filter(user=request.user).update(**update_values)
+                settings = AppSettings.objects.get(user=request.user)
+        
+        response_data = AppSettingsUpdateSerializer(settings).data
+        response_data['version'] = settings.version
+        return Response(response_data, headers={'ETag': f'"{settings.version}"'})
     
     def delete(self, request):
         """Supprime les paramètres (réinitialisation)"""
@@ -183,33 +251,24 @@ class AppSettingsChoicesView(APIView):
     
     permission_classes = [permissions.IsAuthenticated]
     
+    @method_decorator(cache_control(max_age=3600, public=True))
     def get(self, request):
         """Retourne tous les choix disponibles"""
-        serializer = AppSettingsChoicesSerializer({})
-        return Response(serializer.data)
+        return choices_response(request)
 
 
-class AppSettingsBulkUpdateView(APIView):
+class AppSettingsBulkUpdateView(UserSettingsMixin, APIView):
     """Vue pour la mise à jour en lot de plusieurs paramètres"""
     
     permission_classes = [permissions.IsAuthenticated]
     
     def patch(self, request):
         """Mise à jour de plusieurs paramètres à la fois"""
-        settings, created = AppSettings.objects.get_or_create(user=request.user)
-        
-        # Dictionnaire des champs modifiables
-        allowed_fields = [
-            'theme', 'auto_lock_timeout', 'clipboard_clear_timeout',
-            'enable_biometric', 'show_password_strength', 'auto_fill_enabled',
-            'breach_monitoring', 'login_notifications', 'export_format'
-        ]
+        settings, created = self.get_user_settings()
         
         # Filtrer seulement les champs autorisés
-        filtered_data = {
-            key: value for key, value in request.data.items() 
-            if key in allowed_fields
-        }
+        data = request.data
+        filtered_data = {key: data[key] for key in data.keys() & BULK_UPDATE_FIELDS}
         
         if not filtered_data:
             return Response(
@@ -224,10 +283,10 @@ class AppSettingsBulkUpdateView(APIView):
         )
         
         if serializer.is_valid():
-            with transaction.atomic():
-                serializer.save()
+            serializer.save()
             
-            # Retourner les paramètres complets
+            # Retourner les paramètres complets (l'utilisateur est déjà joint
+            # par get_user_settings, pas de requête supplémentaire)
             full_serializer = AppSettingsSerializer(settings)
             return Response({
                 'message': f'{len(filtered_data)} paramètre(s) mis à jour',
@@ -246,7 +305,9 @@ class AppSettingsExportView(APIView):
     def get(self, request):
         """Exporte les paramètres au format demandé"""
         try:
-            settings = AppSettings.objects.get(user=request.user)
+            settings = AppSettings.objects.select_related('user').only(
+                *SETTINGS_ONLY_FIELDS
+            ).get(user=request.user)
         except AppSettings.DoesNotExist:
             return Response(
                 {'message': 'Aucun paramètre trouvé'},
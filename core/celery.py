@@ -0,0 +1,13 @@
+# celery.py
+"""
+Application Celery du projet (tâches asynchrones : emails...)
+"""
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+app = Celery('core')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
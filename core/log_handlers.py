@@ -0,0 +1,31 @@
+# log_handlers.py
+"""
+Handlers de logging pour le développement
+"""
+import atexit
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+
+class QueueStreamHandler(QueueHandler):
+    """
+    Place les enregistrements dans une file ; un thread dédié les formate et
+    les écrit sur stdout, hors du thread qui traite la requête
+    """
+
+    def __init__(self, stream=None):
+        super().__init__(queue.SimpleQueue())
+        self.target = logging.StreamHandler(stream or sys.stdout)
+        self.listener = QueueListener(self.queue, self.target, respect_handler_level=True)
+        self.listener.start()
+        atexit.register(self.listener.stop)
+
+    def setFormatter(self, fmt):
+        # Le formatage est fait par le handler cible, dans le thread du listener
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Pas de formatage ici (QueueHandler.prepare formaterait dans le thread appelant)
+        return record
@@ -63,6 +63,10 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 AUTH_USER_MODEL = 'auths.User'
 
+AUTHENTICATION_BACKENDS = [
+    'auths.backends.LoginModelBackend',
+]
+
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 SECURE_SSL_REDIRECT = True
 SESSION_COOKIE_SECURE = True
@@ -242,3 +246,46 @@ try:
     Fernet(ENCRYPTION_KEY)
 except Exception:
     raise ValueError("ENCRYPTION_KEY is not a valid Fernet key")
+
+# Celery : sans broker configuré, les tâches sont lancées dans un thread (voir auths.views)
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='')
+CELERY_TASK_IGNORE_RESULT = True
+
+# Logging console ; le SQL n'est journalisé que sur demande (DJANGO_SQL_DEBUG=1)
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'verbose': {
+            'format': '%(levelname)s %(asctime)s %(module)s %(process)d %(thread)d %(message)s',
+        },
+    },
+    'handlers': {
+        # Écriture sur stdout depuis un thread dédié (voir core.log_handlers)
+        'console': {
+            'level': 'INFO',
+            'class': 'core.log_handlers.QueueStreamHandler',
+            'formatter': 'verbose'
+        },
+    },
+    'root': {
+        'level': 'INFO',
+        'handlers': ['console'],
+    },
+    'loggers': {
+        'django': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'django.db.backends': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
+if os.environ.get('DJANGO_SQL_DEBUG'):
+    LOGGING['handlers']['console']['level'] = 'DEBUG'
+    LOGGING['loggers']['django.db.backends']['level'] = 'DEBUG'
@@ -1,44 +1,44 @@
 from rest_framework.views import exception_handler
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import serializers, status
+from django.core.exceptions import FieldDoesNotExist
+from functools import lru_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Messages d'erreur par code HTTP
+STATUS_MESSAGES = {
+    status.HTTP_400_BAD_REQUEST: 'Données invalides',
+    status.HTTP_401_UNAUTHORIZED: 'Authentification requise',
+    status.HTTP_403_FORBIDDEN: 'Permission refusée',
+    status.HTTP_404_NOT_FOUND: 'Ressource non trouvée',
+    status.HTTP_405_METHOD_NOT_ALLOWED: 'Méthode non autorisée',
+}
+
 
 def custom_exception_handler(exc, context):
     """
     Gestionnaire d'exceptions personnalisé pour des réponses d'erreur cohérentes
     """
     response = exception_handler(exc, context)
+    if response is None:
+        return None
 
-    if response is not None:
-        custom_response_data = {
-            'error': True,
-            'message': 'Une erreur est survenue',
-            'details': None,
-            'status_code': response.status_code
-        }
-
-        # Personnaliser les messages d'erreur selon le type
-        if response.status_code == status.HTTP_400_BAD_REQUEST:
-            custom_response_data['message'] = 'Données invalides'
-            custom_response_data['details'] = response.data
-        elif response.status_code == status.HTTP_401_UNAUTHORIZED:
-            custom_response_data['message'] = 'Authentification requise'
-        elif response.status_code == status.HTTP_403_FORBIDDEN:
-            custom_response_data['message'] = 'Permission refusée'
-        elif response.status_code == status.HTTP_404_NOT_FOUND:
-            custom_response_data['message'] = 'Ressource non trouvée'
-        elif response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED:
-            custom_response_data['message'] = 'Méthode non autorisée'
-        elif response.status_code >= 500:
-            custom_response_data['message'] = 'Erreur interne du serveur'
-            # Log les erreurs serveur
-            logger.error(f'Server Error: {exc}', exc_info=True)
-
-        response.data = custom_response_data
+    status_code = response.status_code
+    if status_code >= 500:
+        message = 'Erreur interne du serveur'
+        # Log les erreurs serveur
+        logger.error(f'Server Error: {exc}', exc_info=True)
+    else:
+        message = STATUS_MESSAGES.get(status_code, 'Une erreur est survenue')
 
+    response.data = {
+        'error': True,
+        'message': message,
+        'details': response.data if status_code == status.HTTP_400_BAD_REQUEST else None,
+        'status_code': status_code
+    }
     return response
 
 
@@ -67,6 +67,51 @@ def error_response(message="Une erreur est survenue", details=None, status_code=
     return Response(response_data, status=status_code)
 
 
+def _relation_path(model, source):
+    """Préfixe de source qui suit des relations mono-valuées (FK, OneToOne), au format ORM"""
+    path = []
+    for attr in source.split('.'):
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            break
+        if not field.is_relation or field.many_to_many or field.one_to_many:
+            break
+        path.append(attr)
+        model = field.related_model
+    return '__'.join(path)
+
+
+@lru_cache(maxsize=None)
+def related_lookups(serializer_class, model):
+    """
+    Déduit des champs du serializer les relations à charger :
+    (select_related, prefetch_related). Les sources pointées (category.name)
+    et les serializers imbriqués donnent des jointures, les serializers
+    many=True sur une relation inverse donnent des prefetch
+    """
+    from rest_framework.relations import RelatedField
+    
+    select, prefetch = set(), set()
+    for field in serializer_class().fields.values():
+        if field.write_only or field.source == '*':
+            continue
+        if isinstance(field, serializers.ListSerializer):
+            try:
+                if model._meta.get_field(field.source).is_relation:
+                    prefetch.add(field.source)
+            except FieldDoesNotExist:
+                pass
+            continue
+        if isinstance(field, RelatedField) and '.' not in field.source:
+            # Clé primaire seule : lue depuis la colonne *_id, sans jointure
+            continue
+        path = _relation_path(model, field.source)
+        if path and ('.' in field.source or isinstance(field, serializers.BaseSerializer)):
+            select.add(path)
+    return tuple(sorted(select)), tuple(sorted(prefetch))
+
+
 def paginated_response(queryset, serializer_class, request, message="Données récupérées avec succès"):
     """
     Fonction utilitaire pour créer des réponses paginées cohérentes
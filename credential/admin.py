@@ -1,14 +1,45 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from django.urls import reverse
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, JsonResponse
+from django.urls import path, reverse
 from django.utils.safestring import mark_safe
 from django.db.models import Count, Q
 from django.utils import timezone
 from datetime import timedelta
 from django import forms
+import threading
 
 from .models import Category, Credential, PasswordHistory
+from .utils import humanize_last_used_html
 
+# Seuils (du plus élevé au plus bas) : couleur et libellé de la force du mot de passe
+_STRENGTH_BUCKETS = (
+    (80, '#28a745', 'Fort'),         # Vert
+    (60, '#ffc107', 'Moyen'),        # Jaune
+    (40, '#fd7e14', 'Faible'),       # Orange
+    (0, '#dc3545', 'Très faible'),   # Rouge
+)
+
+# Requête de la liste en cours (par thread : l'instance ModelAdmin est partagée)
+_changelist_state = threading.local()
+
+
+def _request_now(request):
+    """Retourne un unique timezone.now() mémorisé sur la requête"""
+    if not hasattr(request, '_now_cache'):
+        request._now_cache = timezone.now()
+    return request._now_cache
+
+
+_STRENGTH_TMPL = (
+    '<div style="display: flex; align-items: center;">'
+    '<div style="width: 50px; height: 10px; background-color: #e9ecef; margin-right: 10px; border-radius: 5px;">'
+    '<div style="width: {strength}%; height: 100%; background-color: {color}; border-radius: 5px;"></div>'
+    '</div>'
+    '<span>{text} ({strength}%)</span>'
+    '</div>'
+)
 
 class CredentialAdminForm(forms.ModelForm):
     """Formulaire personnalisé pour l'admin des credentials"""
@@ -90,9 +121,9 @@ class CategoryAdmin(admin.ModelAdmin):
     
     def credential_count(self, obj):
         """Compte le nombre de credentials dans cette catégorie"""
-        count = obj.credential_set.count()
+        count = obj.credential_count
         if count > 0:
-            url = reverse('admin:credentials_credential_changelist') + f'?category__id__exact={obj.id}'
+            url = reverse('admin:credential_credential_changelist') + f'?category__id__exact={obj.id}'
             return format_html('<a href="{}">{} credential(s)</a>', url, count)
         return "0"
     credential_count.short_description = "Credentials"
@@ -111,6 +142,25 @@ class PasswordHistoryInline(admin.TabularInline):
     
     def has_add_permission(self, request, obj=None):
         return False
+    
+    def get_queryset(self, request):
+        # __str__ de chaque ligne lit credential.name
+        return super().get_queryset(request).select_related('credential')
+
+
+class CategoryListFilter(admin.SimpleListFilter):
+    """Filtre limité aux catégories effectivement utilisées par des credentials"""
+    title = 'catégorie'
+    parameter_name = 'category'
+    
+    def lookups(self, request, model_admin):
+        used = model_admin.get_queryset(request).values('category_id')
+        return Category.objects.filter(id__in=used).values_list('id', 'name')
+    
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(category_id=self.value())
+        return queryset
 
 
 @admin.register(Credential)
@@ -121,10 +171,8 @@ class CredentialAdmin(admin.ModelAdmin):
         'is_favorite', 'is_shared', 'password_strength_display',
         'last_used_display', 'created_at'
     ]
-    list_filter = [
-        'is_favorite', 'is_shared', 'auto_generated', 'category',
-        'created_at', 'last_used_at', 'password_changed_at'
-    ]
+    # Pas de filtres sur les dates : date_hierarchy couvre created_at
+    list_filter = ['is_favorite', 'is_shared', 'auto_generated', CategoryListFilter]
     search_fields = ['name', 'username', 'url', 'owner__email', 'owner__username']
     readonly_fields = [
         'created_at', 'updated_at', 'last_used_at',
@@ -132,6 +180,7 @@ class CredentialAdmin(admin.ModelAdmin):
     ]
     filter_horizontal = []
     raw_id_fields = ['owner', 'folder']
+    list_select_related = ['owner', 'category', 'folder', 'folder__owner']
     ordering = ['-created_at']
     date_hierarchy = 'created_at'
     
@@ -162,75 +211,86 @@ class CredentialAdmin(admin.ModelAdmin):
     
     def password_strength_display(self, obj):
         """Affiche la force du mot de passe avec une barre colorée"""
-        strength = obj.password_strength
-        if strength >= 80:
-            color = '#28a745'  # Vert
-            text = 'Fort'
-        elif strength >= 60:
-            color = '#ffc107'  # Jaune
-            text = 'Moyen'
-        elif strength >= 40:
-            color = '#fd7e14'  # Orange
-            text = 'Faible'
-        else:
-            color = '#dc3545'  # Rouge
-            text = 'Très faible'
-        
-        return format_html(
-            '<div style="display: flex; align-items: center;">'
-            '<div style="width: 50px; height: 10px; background-color: #e9ecef; margin-right: 10px; border-radius: 5px;">'
-            '<div style="width: {}%; height: 100%; background-color: {}; border-radius: 5px;"></div>'
-            '</div>'
-            '<span>{} ({}%)</span>'
-            '</div>',
-            strength, color, text, strength
-        )
+        # Valeurs entières et constantes : pas d'échappement nécessaire
+        strength = int(obj.password_strength)
+        for threshold, color, text in _STRENGTH_BUCKETS:
+            if strength >= threshold:
+                break
+        return mark_safe(_STRENGTH_TMPL.format(strength=strength, color=color, text=text))
     password_strength_display.short_description = "Force du mot de passe"
     
     def last_used_display(self, obj):
         """Affiche la dernière utilisation de manière lisible"""
-        if not obj.last_used_at:
-            return format_html('<span style="color: #6c757d;">Jamais utilisé</span>')
-        
-        now = timezone.now()
-        diff = now - obj.last_used_at
-        
-        if diff.days == 0:
-            return format_html('<span style="color: #28a745;">Aujourd\'hui</span>')
-        elif diff.days == 1:
-            return format_html('<span style="color: #28a745;">Hier</span>')
-        elif diff.days <= 7:
-            return format_html('<span style="color: #ffc107;">Il y a {} jours</span>', diff.days)
-        elif diff.days <= 30:
-            weeks = diff.days // 7
-            return format_html('<span style="color: #fd7e14;">Il y a {} semaine(s)</span>', weeks)
-        else:
-            months = diff.days // 30
-            return format_html('<span style="color: #dc3545;">Il y a {} mois</span>', months)
+        request = getattr(_changelist_state, 'request', None)
+        now = _request_now(request) if request is not None else timezone.now()
+        return humanize_last_used_html(obj.last_used_at, now)
     
     last_used_display.short_description = "Dernière utilisation"
     
     def decrypted_password_display(self, obj):
-        """Affiche le mot de passe déchiffré (pour l'admin seulement)"""
+        """Bouton de révélation : le mot de passe n'est déchiffré qu'à la demande (AJAX)"""
         if obj.pk:  # L'objet existe déjà
-            try:
-                password = obj.decrypt_password()
-                if password:
-                    return format_html(
-                        '<input type="password" value="{}" readonly style="width: 200px;" '
-                        'onclick="this.type=this.type===\'password\'?\'text\':\'password\'" '
-                        'title="Cliquez pour afficher/masquer">',
-                        password
-                    )
-                return "Aucun mot de passe"
-            except Exception as e:
-                return format_html('<span style="color: red;">Erreur de déchiffrement: {}</span>', str(e))
+            url = reverse('admin:credential_credential_reveal', args=[obj.pk])
+            return format_html(
+                '<input type="password" value="" readonly placeholder="••••••••" style="width: 200px;"> '
+                '<button type="button" class="button" data-url="{}" '
+                'onclick="var b=this;fetch(b.dataset.url,{{credentials:\'same-origin\'}})'
+                '.then(function(r){{return r.json();}})'
+                '.then(function(d){{var i=b.previousElementSibling;i.value=d.password||\'\';i.type=\'text\';}});">'
+                'Révéler</button>',
+                url
+            )
         return "Sauvegardez d'abord l'objet"
     
     decrypted_password_display.short_description = "Mot de passe (cliquez pour révéler)"
     
+    def get_urls(self):
+        urls = [
+            path(
+                '<path:object_id>/reveal/',
+                self.admin_site.admin_view(self.reveal_password_view),
+                name='credential_credential_reveal',
+            ),
+        ]
+        return urls + super().get_urls()
+    
+    def reveal_password_view(self, request, object_id):
+        """Retourne le mot de passe déchiffré en JSON (staff ayant le droit de consultation)"""
+        obj = self.get_object(request, object_id)
+        if obj is None:
+            raise Http404
+        if not self.has_view_or_change_permission(request, obj):
+            raise PermissionDenied
+        return JsonResponse({'password': obj.decrypt_password()})
+    
+    # Colonnes lues par la liste (jamais les blobs chiffrés)
+    changelist_only_fields = (
+        'name', 'username', 'url', 'category_id', 'folder_id', 'owner_id',
+        'is_favorite', 'is_shared', 'password_strength', 'last_used_at', 'created_at',
+        'owner__email', 'owner__username', 'category__name',
+        'folder__name', 'folder__owner__email',
+    )
+    
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('owner', 'category', 'folder')
+        queryset = super().get_queryset(request).select_related(
+            'owner', 'category', 'folder', 'folder__owner'
+        )
+        match = request.resolver_match
+        if match is not None and match.url_name == 'credential_credential_changelist':
+            queryset = queryset.only(*self.changelist_only_fields)
+        return queryset
+    
+    def changelist_view(self, request, extra_context=None):
+        # last_used_display ne reçoit que l'objet : la requête (et son "now") est
+        # exposée le temps du rendu de la liste
+        _changelist_state.request = request
+        try:
+            response = super().changelist_view(request, extra_context)
+            if hasattr(response, 'render'):
+                response.render()
+            return response
+        finally:
+            _changelist_state.request = None
     
     def save_model(self, request, obj, form, change):
         """Personnalise la sauvegarde pour gérer le chiffrement"""
@@ -247,6 +307,7 @@ class PasswordHistoryAdmin(admin.ModelAdmin):
     list_filter = ['created_at']
     search_fields = ['credential__name', 'credential__owner__email']
     readonly_fields = ['credential', 'password_hash', 'created_at', 'updated_at']
+    list_select_related = ['credential', 'credential__owner']
     ordering = ['-created_at']
     date_hierarchy = 'created_at'
     
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-15 22:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credential', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='credential',
+            name='password_tag',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
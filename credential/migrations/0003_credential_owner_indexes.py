@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-15 22:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credential', '0002_credential_password_tag'),
+        ('folder', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='credential',
+            index=models.Index(fields=['owner', 'category'], name='credential__owner_i_335eef_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='credential',
+            index=models.Index(fields=['owner', '-last_used_at'], name='credential__owner_i_59ba36_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='credential',
+            index=models.Index(fields=['owner', 'password_changed_at'], name='credential__owner_i_f3e9c5_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-15 22:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credential', '0003_credential_owner_indexes'),
+        ('folder', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='credential',
+            name='credential__owner_i_a4c344_idx',
+        ),
+        migrations.AddIndex(
+            model_name='credential',
+            index=models.Index(condition=models.Q(('is_favorite', True)), fields=['owner', 'is_favorite'], name='cred_owner_fav_partial'),
+        ),
+        migrations.AddIndex(
+            model_name='credential',
+            index=models.Index(fields=['owner', '-created_at'], name='credential__owner_i_dca61d_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-15 23:05
+
+from django.db import migrations
+
+
+def reset_password_tags(apps, schema_editor):
+    # Les anciennes empreintes ne sont pas liées au credential : on les efface,
+    # password_matches retombe sur le déchiffrement jusqu'au prochain changement
+    Credential = apps.get_model('credential', 'Credential')
+    Credential.objects.exclude(password_tag='').update(password_tag='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('credential', '0004_credential_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(reset_password_tags, migrations.RunPython.noop),
+    ]
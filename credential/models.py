@@ -6,13 +6,69 @@ from django.db import models
 from django.utils import timezone
 from django.conf import settings
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from functools import lru_cache
 import base64
+import hashlib
+import hmac
+import os
 from core.models import BaseModel
 from django.contrib.auth import get_user_model
 
 from folder.models import Folder
 User = get_user_model()
 
+
+# Format des valeurs chiffrées : préfixe de version + nonce + texte chiffré AES-GCM.
+# Les anciens jetons Fernet (commençant par "gAAAA") restent déchiffrables.
+_AESGCM_PREFIX = b'\x01'
+_NONCE_SIZE = 12
+
+# Nombre d'entrées d'historique conservées (et exposées) par credential
+PASSWORD_HISTORY_LIMIT = 10
+
+
+@lru_cache(maxsize=1)
+def _get_cached_fernet(key):
+    """Instance Fernet mémorisée pour la clé donnée"""
+    return Fernet(key)
+
+
+@lru_cache(maxsize=1)
+def _get_cached_aead(key):
+    """Instance AES-GCM dont la clé est dérivée (HKDF-SHA256) de la clé Fernet"""
+    derived_key = HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=None,
+        info=b'credential-aes-gcm',
+    ).derive(base64.urlsafe_b64decode(key))
+    return AESGCM(derived_key)
+
+
+@lru_cache(maxsize=1)
+def _get_cached_tag_key(key):
+    """Clé HMAC des empreintes de mot de passe, dérivée (HKDF-SHA256) de la clé Fernet"""
+    return HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=None,
+        info=b'credential-password-tag',
+    ).derive(base64.urlsafe_b64decode(key))
+
+
+def compute_password_tag(password: str, owner_id, credential_id) -> str:
+    """
+    Empreinte HMAC-SHA256 d'un mot de passe en clair, liée au propriétaire et au
+    credential : deux credentials au même mot de passe ont des empreintes différentes
+    """
+    key = _get_cached_tag_key(settings.ENCRYPTION_KEY)
+    message = f'{owner_id}:{credential_id}:{password}'.encode()
+    return hmac.new(key, message, hashlib.sha256).hexdigest()
+
+
 class Category(BaseModel):
     """Catégories pour organiser les credentials"""
     
@@ -48,6 +104,8 @@ class Credential(BaseModel):
     name = models.CharField(max_length=255, db_index=True)
     username = models.CharField(max_length=255, blank=True)
     password_encrypted = models.BinaryField()
+    # HMAC du mot de passe (usage serveur uniquement) : comparaison sans déchiffrement
+    password_tag = models.CharField(max_length=64, blank=True, default='')
     url = models.URLField(blank=True)
     notes_encrypted = models.BinaryField(blank=True)
     
@@ -68,8 +126,18 @@ class Credential(BaseModel):
         verbose_name_plural = 'Credentials'
         indexes = [
             models.Index(fields=['owner', 'name']),
-            models.Index(fields=['owner', 'is_favorite']),
+            # Index partiel : seules les lignes favorites (?is_favorite=true)
+            models.Index(
+                fields=['owner', 'is_favorite'],
+                condition=models.Q(is_favorite=True),
+                name='cred_owner_fav_partial',
+            ),
             models.Index(fields=['owner', 'folder']),
+            models.Index(fields=['owner', 'category']),
+            models.Index(fields=['owner', '-last_used_at']),
+            models.Index(fields=['owner', 'password_changed_at']),
+            # Tri par défaut de la liste (ordering = -created_at)
+            models.Index(fields=['owner', '-created_at']),
             models.Index(fields=['created_at']),
             models.Index(fields=['last_used_at']),
         ]
@@ -78,23 +146,45 @@ class Credential(BaseModel):
         return f"{self.name} ({self.owner.email})"
     
     def _get_fernet(self):
-        """Retourne l'instance Fernet pour le chiffrement"""
+        """Retourne l'instance Fernet (déchiffrement des anciennes valeurs)"""
         if not hasattr(settings, 'ENCRYPTION_KEY'):
             raise ValueError("ENCRYPTION_KEY non configurée dans les settings")
-        return Fernet(settings.ENCRYPTION_KEY)
+        return _get_cached_fernet(settings.ENCRYPTION_KEY)
+    
+    def _get_aead(self):
+        """Retourne l'instance AES-GCM pour le chiffrement"""
+        if not hasattr(settings, 'ENCRYPTION_KEY'):
+            raise ValueError("ENCRYPTION_KEY non configurée dans les settings")
+        return _get_cached_aead(settings.ENCRYPTION_KEY)
+    
+    def _encrypt(self, value: str) -> bytes:
+        """Chiffre une valeur avec AES-GCM (nonce aléatoire de 96 bits)"""
+        nonce = os.urandom(_NONCE_SIZE)
+        return _AESGCM_PREFIX + nonce + self._get_aead().encrypt(nonce, value.encode(), None)
+    
+    def _decrypt_aead(self, data: bytes) -> str:
+        """Déchiffre une valeur au format AES-GCM"""
+        nonce = data[1:1 + _NONCE_SIZE]
+        return self._get_aead().decrypt(nonce, data[1 + _NONCE_SIZE:], None).decode()
     
     def encrypt_password(self, password: str) -> None:
         """Chiffre et stocke le mot de passe"""
         if password:
-            fernet = self._get_fernet()
-            self.password_encrypted = fernet.encrypt(password.encode())
+            self.password_encrypted = self._encrypt(password)
+            self.password_tag = compute_password_tag(password, self.owner_id, self.pk)
+    
+    def password_matches(self, password: str) -> bool:
+        """Compare en temps constant avec le mot de passe stocké (déchiffre seulement sans empreinte)"""
+        if self.password_tag:
+            return hmac.compare_digest(
+                self.password_tag, compute_password_tag(password, self.owner_id, self.pk)
+            )
+        return hmac.compare_digest(self.decrypt_password().encode(), password.encode())
     
     def decrypt_password(self) -> str:
         """Déchiffre et retourne le mot de passe"""
         if self.password_encrypted:
             try:
-                fernet = self._get_fernet()
-                
                 # Handle different data types from database
                 encrypted_data = self.password_encrypted
                 
@@ -106,6 +196,12 @@ class Credential(BaseModel):
                 elif not isinstance(encrypted_data, (bytes, str)):
                     encrypted_data = bytes(encrypted_data)
                 
+                if isinstance(encrypted_data, bytes) and encrypted_data.startswith(_AESGCM_PREFIX):
+                    return self._decrypt_aead(encrypted_data)
+                
+                # Ancien format Fernet
+                fernet = self._get_fernet()
+                
                 # Convert bytes to string if needed
                 if isinstance(encrypted_data, bytes):
                     encrypted_data = encrypted_data.decode('utf-8')
@@ -127,15 +223,17 @@ class Credential(BaseModel):
     def encrypt_notes(self, notes: str) -> None:
         """Chiffre et stocke les notes"""
         if notes:
-            fernet = self._get_fernet()
-            self.notes_encrypted = fernet.encrypt(notes.encode())
+            self.notes_encrypted = self._encrypt(notes)
     
     def decrypt_notes(self) -> str:
         """Déchiffre et retourne les notes"""
         if self.notes_encrypted:
             try:
-                fernet = self._get_fernet()
-                return fernet.decrypt(self.notes_encrypted).decode()
+                encrypted_data = bytes(self.notes_encrypted)
+                if encrypted_data.startswith(_AESGCM_PREFIX):
+                    return self._decrypt_aead(encrypted_data)
+                # Ancien format Fernet
+                return self._get_fernet().decrypt(encrypted_data).decode()
             except Exception:
                 return ""
         return ""
@@ -8,16 +8,29 @@ from django.utils import timezone
 from django.core.validators import URLValidator
 from django.core.exceptions import ValidationError as DjangoValidationError
 import re
+import secrets
+import string
 
-from .models import Category, Credential, PasswordHistory
+from .models import Category, Credential, PasswordHistory, PASSWORD_HISTORY_LIMIT
+from .utils import character_classes, humanize_last_used, random_chars
 
 User = get_user_model()
 
+_ICON_LABELS = dict(Category.CategoryIcons.choices)
+
+# Format des dates de l'historique, sans passer par un serializer par ligne
+_HISTORY_DATETIME = serializers.DateTimeField()
+
+_HEX_COLOR_RE = re.compile(r'^#[0-9A-Fa-f]{6}$')
+
+# Symboles ajoutés par le générateur de mots de passe
+_GENERATOR_SYMBOLS = "!@#$%^&*()_+-=[]{}|;:,.<>?"
+
 
 class CategorySerializer(serializers.ModelSerializer):
     """Serializer pour les catégories"""
     credential_count = serializers.SerializerMethodField(read_only=True)
-    icon_display = serializers.CharField(source='get_icon_display', read_only=True)
+    icon_display = serializers.SerializerMethodField()
     
     class Meta:
         model = Category
@@ -29,14 +42,21 @@ class CategorySerializer(serializers.ModelSerializer):
     
     def get_credential_count(self, obj):
         """Retourne le nombre de credentials dans cette catégorie"""
+        # Annoté par CategoryViewSet.get_queryset (évite une requête par catégorie)
+        if hasattr(obj, 'credential_count'):
+            return obj.credential_count
         request = self.context.get('request')
         if request and hasattr(request, 'user'):
             return obj.credential_set.filter(owner=request.user).count()
         return obj.credential_set.count()
     
+    def get_icon_display(self, obj):
+        """Retourne le label de l'icône"""
+        return _ICON_LABELS.get(obj.icon, obj.icon)
+    
     def validate_color(self, value):
         """Valide le format hexadécimal de la couleur"""
-        if not re.match(r'^#[0-9A-Fa-f]{6}$', value):
+        if not _HEX_COLOR_RE.match(value):
             raise serializers.ValidationError(
                 "La couleur doit être au format hexadécimal (#RRGGBB)"
             )
@@ -79,38 +99,25 @@ class CredentialListSerializer(serializers.ModelSerializer):
     
     def get_has_password(self, obj):
         """Indique si le credential a un mot de passe"""
+        if hasattr(obj, 'password_length'):
+            return bool(obj.password_length)
         return bool(obj.password_encrypted)
     
     def get_has_notes(self, obj):
         """Indique si le credential a des notes"""
+        if hasattr(obj, 'notes_length'):
+            return bool(obj.notes_length)
         return bool(obj.notes_encrypted)
     
     def get_password_age_days(self, obj):
         """Retourne l'âge du mot de passe en jours"""
         if obj.password_changed_at:
-            return (timezone.now() - obj.password_changed_at).days
+            return ((self.context.get('now') or timezone.now()) - obj.password_changed_at).days
         return None
     
     def get_last_used_display(self, obj):
         """Retourne un affichage formaté de la dernière utilisation"""
-        if not obj.last_used_at:
-            return "Jamais utilisé"
-        
-        now = timezone.now()
-        diff = now - obj.last_used_at
-        
-        if diff.days == 0:
-            return "Aujourd'hui"
-        elif diff.days == 1:
-            return "Hier"
-        elif diff.days <= 7:
-            return f"Il y a {diff.days} jours"
-        elif diff.days <= 30:
-            weeks = diff.days // 7
-            return f"Il y a {weeks} semaine(s)"
-        else:
-            months = diff.days // 30
-            return f"Il y a {months} mois"
+        return humanize_last_used(obj.last_used_at, self.context.get('now') or timezone.now())
 
 
 class CredentialDetailSerializer(serializers.ModelSerializer):
@@ -123,7 +130,7 @@ class CredentialDetailSerializer(serializers.ModelSerializer):
     notes = serializers.CharField(write_only=True, required=False, allow_blank=True)
     decrypted_password = serializers.SerializerMethodField(read_only=True)
     decrypted_notes = serializers.SerializerMethodField(read_only=True)
-    password_history = PasswordHistorySerializer(many=True, read_only=True)
+    password_history = serializers.SerializerMethodField()
     password_age_days = serializers.SerializerMethodField()
     
     class Meta:
@@ -167,9 +174,19 @@ class CredentialDetailSerializer(serializers.ModelSerializer):
     def get_password_age_days(self, obj):
         """Retourne l'âge du mot de passe en jours"""
         if obj.password_changed_at:
-            return (timezone.now() - obj.password_changed_at).days
+            return ((self.context.get('now') or timezone.now()) - obj.password_changed_at).days
         return None
     
+    def get_password_history(self, obj):
+        """Dernières entrées de l'historique, projetées sans instancier de modèles"""
+        rows = obj.password_history.order_by('-created_at').values_list(
+            'id', 'created_at'
+        )[:PASSWORD_HISTORY_LIMIT]
+        return [
+            {'id': pk, 'created_at': _HISTORY_DATETIME.to_representation(created_at)}
+            for pk, created_at in rows
+        ]
+    
     def validate_url(self, value):
         """Valide l'URL si elle est fournie"""
         if value:
@@ -209,14 +226,8 @@ class CredentialDetailSerializer(serializers.ModelSerializer):
             score += 15
         
         # Caractères
-        if re.search(r'[a-z]', password):
-            score += 10
-        if re.search(r'[A-Z]', password):
-            score += 10
-        if re.search(r'\d', password):
-            score += 10
-        if re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
-            score += 20
+        has_lower, has_upper, has_digit, has_symbol = character_classes(password)
+        score += 10 * (has_lower + has_upper + has_digit) + 20 * has_symbol
         
         return min(score, 100)
     
@@ -230,7 +241,8 @@ class CredentialDetailSerializer(serializers.ModelSerializer):
         if request and hasattr(request, 'user'):
             validated_data['owner'] = request.user
         
-        credential = Credential.objects.create(**validated_data)
+        # Instance complétée avant un unique INSERT
+        credential = Credential(**validated_data)
         
         if password:
             credential.encrypt_password(password)
@@ -261,8 +273,7 @@ class CredentialDetailSerializer(serializers.ModelSerializer):
         
         # Gérer le mot de passe
         if password is not None:
-            old_password = instance.decrypt_password()
-            if password != old_password:
+            if not instance.password_matches(password):
                 instance.encrypt_password(password)
                 instance.password_strength = self._calculate_password_strength(password)
                 instance.password_changed_at = timezone.now()
@@ -304,24 +315,17 @@ class CredentialCreateSerializer(serializers.ModelSerializer):
     
     def _generate_password(self, length, include_symbols):
         """Génère un mot de passe sécurisé"""
-        import secrets
-        import string
-        
-        characters = string.ascii_letters + string.digits
+        pools = [string.ascii_lowercase, string.ascii_uppercase, string.digits]
         if include_symbols:
-            characters += "!@#$%^&*()_+-=[]{}|;:,.<>?"
+            pools.append(_GENERATOR_SYMBOLS)
+        characters = ''.join(pools)
         
-        password = ''.join(secrets.choice(characters) for _ in range(length))
-        
-        # S'assurer qu'on a au moins un caractère de chaque type
-        if not re.search(r'[a-z]', password):
-            password = password[:-1] + secrets.choice(string.ascii_lowercase)
-        if not re.search(r'[A-Z]', password):
-            password = password[:-1] + secrets.choice(string.ascii_uppercase)
-        if not re.search(r'\d', password):
-            password = password[:-1] + secrets.choice(string.digits)
-        if include_symbols and not re.search(r'[!@#$%^&*()_+\-=\[\]{}|;:,.<>?]', password):
-            password = password[:-1] + secrets.choice("!@#$%^&*")
+        # Au moins un caractère de chaque type, puis mélange : aucune
+        # vérification a posteriori n'est nécessaire
+        chars = [secrets.choice(pool) for pool in pools]
+        chars += random_chars(characters, length - len(chars))
+        secrets.SystemRandom().shuffle(chars)
+        password = ''.join(chars)
         
         return password
     
@@ -337,6 +341,23 @@ class CredentialCreateSerializer(serializers.ModelSerializer):
         return detail_serializer.create(validated_data)
 
 
+class PasswordGeneratorSerializer(serializers.Serializer):
+    """Options de génération de mot de passe"""
+    length = serializers.IntegerField(required=False, default=16, min_value=4, max_value=128)
+    include_symbols = serializers.BooleanField(required=False, default=True)
+    include_numbers = serializers.BooleanField(required=False, default=True)
+    include_uppercase = serializers.BooleanField(required=False, default=True)
+    include_lowercase = serializers.BooleanField(required=False, default=True)
+    exclude_ambiguous = serializers.BooleanField(required=False, default=False)
+    
+    def validate(self, attrs):
+        if not any(attrs[name] for name in (
+            'include_symbols', 'include_numbers', 'include_uppercase', 'include_lowercase'
+        )):
+            raise serializers.ValidationError("Au moins un type de caractère doit être sélectionné")
+        return attrs
+
+
 class CredentialUpdateLastUsedSerializer(serializers.ModelSerializer):
     """Serializer pour mettre à jour seulement la date de dernière utilisation"""
     
@@ -1,3 +1,232 @@
-from django.test import TestCase
+import json
+from unittest import mock
 
-# Create your tests here.
+from cryptography.fernet import Fernet
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from auths.models import User
+from . import admin as credential_admin
+from .models import Credential, PasswordHistory, PASSWORD_HISTORY_LIMIT
+from .serializers import CredentialDetailSerializer
+from .utils import random_chars
+
+
+class PasswordTagTests(TestCase):
+    """Tests de l'empreinte HMAC des mots de passe"""
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', email='alice@example.com', password='x')
+        self.bob = User.objects.create_user(username='bob', email='bob@example.com', password='x')
+
+    def _credential(self, owner, password):
+        credential = Credential(owner=owner, name='site')
+        credential.encrypt_password(password)
+        credential.save()
+        return credential
+
+    def test_same_password_gives_distinct_tags(self):
+        first = self._credential(self.alice, 'hunter2')
+        second = self._credential(self.alice, 'hunter2')
+        other = self._credential(self.bob, 'hunter2')
+        self.assertEqual(len({first.password_tag, second.password_tag, other.password_tag}), 3)
+        self.assertTrue(first.password_matches('hunter2'))
+        self.assertFalse(first.password_matches('hunter3'))
+
+    def test_tag_is_not_serialized(self):
+        credential = self._credential(self.alice, 'hunter2')
+        self.assertNotIn('password_tag', CredentialDetailSerializer(credential).data)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class PasswordGeneratorTests(TestCase):
+    """Tests de la génération de mots de passe"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create_user(username='alice', email='alice@example.com', password='x')
+        )
+
+    def test_random_chars_rejects_empty_alphabet(self):
+        with self.assertRaises(ValueError):
+            random_chars('', 8)
+
+    def test_generate_password_respects_length(self):
+        response = self.client.post('/api/credentials/generate-password/', {'length': 20}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['password']), 20)
+
+    def test_generate_password_rejects_empty_character_set(self):
+        response = self.client.post('/api/credentials/generate-password/', {
+            'include_symbols': False,
+            'include_numbers': False,
+            'include_uppercase': False,
+            'include_lowercase': False,
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class PasswordHistoryAccessTests(TestCase):
+    """Tests des permissions sur l'historique des mots de passe"""
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', email='alice@example.com', password='x')
+        self.bob = User.objects.create_user(username='bob', email='bob@example.com', password='x')
+        self.credential = Credential(owner=self.alice, name='site')
+        self.credential.encrypt_password('hunter2')
+        self.credential.save()
+        self.url = f'/api/credentials/{self.credential.pk}/history/'
+
+    def _get(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get(self.url)
+
+    def test_non_owner_denied_after_owner_loaded_history(self):
+        self.assertEqual(self._get(self.alice).status_code, 200)
+        self.assertEqual(self._get(self.bob).status_code, 403)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class CredentialAdminChangelistTests(TestCase):
+    """Tests de la liste des credentials dans l'admin"""
+
+    def test_last_used_display_shares_one_now_per_request(self):
+        admin_user = User.objects.create_superuser(username='admin', email='admin@example.com', password='x')
+        for name in ('a', 'b', 'c'):
+            credential = Credential(owner=admin_user, name=name)
+            credential.encrypt_password('hunter2')
+            credential.save()
+        self.client.force_login(admin_user)
+        with mock.patch.object(
+            credential_admin, 'humanize_last_used_html', wraps=credential_admin.humanize_last_used_html
+        ) as humanize:
+            response = self.client.get('/admin/credential/credential/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(humanize.call_count, 3)
+        self.assertEqual(len({call.args[1] for call in humanize.call_args_list}), 1)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class PasswordStrengthTests(TestCase):
+    """Tests de l'analyse de force d'un mot de passe enregistré"""
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username='alice', email='alice@example.com', password='x')
+        self.credential = Credential(owner=self.alice, name='site')
+        self.credential.encrypt_password('Motdepasse2024!')
+        self.credential.save()
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def test_cached_analysis_holds_no_password_fragment(self):
+        response = self.client.get(f'/api/credentials/{self.credential.pk}/password-strength/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['analysis']['has_dictionary_words'])
+        cached = cache.get(f'password_strength_{self.credential.pk}_{self.credential.password_tag}')
+        self.assertEqual(cached, response.data)
+        self.assertNotIn('motdepasse', str(cached).lower())
+
+
+class EncryptionTests(TestCase):
+    """Tests du chiffrement AES-GCM et de la lecture des anciennes valeurs Fernet"""
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', email='alice@example.com', password='x')
+
+    def test_aes_gcm_round_trip(self):
+        credential = Credential(owner=self.alice, name='site')
+        credential.encrypt_password('hunter2')
+        credential.encrypt_notes('note')
+        credential.save()
+        credential = Credential.objects.get(pk=credential.pk)
+        self.assertEqual(bytes(credential.password_encrypted)[:1], b'\x01')
+        self.assertEqual(credential.decrypt_password(), 'hunter2')
+        self.assertEqual(credential.decrypt_notes(), 'note')
+
+    def test_legacy_fernet_values_still_decrypt(self):
+        fernet = Fernet(settings.ENCRYPTION_KEY)
+        credential = Credential.objects.create(
+            owner=self.alice, name='legacy',
+            password_encrypted=fernet.encrypt('ancien-mot-de-passe'.encode()),
+            notes_encrypted=fernet.encrypt('anciennes notes'.encode()),
+        )
+        credential = Credential.objects.get(pk=credential.pk)
+        self.assertEqual(credential.decrypt_password(), 'ancien-mot-de-passe')
+        self.assertEqual(credential.decrypt_notes(), 'anciennes notes')
+        self.assertTrue(credential.password_matches('ancien-mot-de-passe'))
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class CredentialApiTests(TestCase):
+    """Tests de l'API des credentials (cache, export, historique, permissions)"""
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username='alice', email='alice@example.com', password='x')
+        self.bob = User.objects.create_user(username='bob', email='bob@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def _create(self, name, password='Initial-pass-1', notes=''):
+        response = self.client.post(
+            '/api/credentials/', {'name': name, 'password': password, 'notes': notes}, format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        return Credential.objects.get(owner=self.alice, name=name)
+
+    def _stats(self):
+        response = self.client.get('/api/credentials/dashboard-stats/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_dashboard_stats_invalidated_on_writes(self):
+        self.assertEqual(self._stats()['total_credentials'], 0)
+        credential = self._create('site')
+        self.assertEqual(self._stats()['total_credentials'], 1)
+        self.client.delete(f'/api/credentials/{credential.pk}/')
+        self.assertEqual(self._stats()['total_credentials'], 0)
+
+    def test_export_streams_owned_credentials_with_notes(self):
+        self._create('site', notes='note secrète')
+        other = Credential(owner=self.bob, name='bob-site')
+        other.encrypt_password('x')
+        other.save()
+        response = self.client.get('/api/credentials/export/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        body = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(body['total_credentials'], 1)
+        self.assertEqual(body['credentials'][0]['name'], 'site')
+        self.assertEqual(body['credentials'][0]['notes'], 'note secrète')
+        self.assertNotIn('password', body['credentials'][0])
+
+    def test_history_trimmed_to_limit(self):
+        credential = self._create('site')
+        for i in range(PASSWORD_HISTORY_LIMIT + 3):
+            response = self.client.patch(
+                f'/api/credentials/{credential.pk}/', {'password': f'Changed-pass-{i}'}, format='json'
+            )
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            PasswordHistory.objects.filter(credential=credential).count(), PASSWORD_HISTORY_LIMIT
+        )
+
+    def test_unchanged_password_adds_no_history(self):
+        credential = self._create('site')
+        self.client.patch(f'/api/credentials/{credential.pk}/', {'password': 'Initial-pass-1'}, format='json')
+        self.assertFalse(PasswordHistory.objects.filter(credential=credential).exists())
+
+    def test_non_owner_cannot_read_strength_or_history(self):
+        credential = self._create('site')
+        self.client.force_authenticate(self.bob)
+        # Hors du queryset de l'utilisateur : introuvable plutôt qu'interdit
+        strength = self.client.get(f'/api/credentials/{credential.pk}/password-strength/')
+        self.assertEqual(strength.status_code, 404)
+        history = self.client.get(f'/api/credentials/{credential.pk}/history/')
+        self.assertEqual(history.status_code, 403)
@@ -0,0 +1,74 @@
+# utils.py
+"""
+Fonctions utilitaires pour les credentials
+"""
+from django.utils.html import format_html
+import secrets
+import string
+
+# Classes de caractères pour l'analyse des mots de passe
+LOWER = frozenset(string.ascii_lowercase)
+UPPER = frozenset(string.ascii_uppercase)
+DIGITS = frozenset(string.digits)
+SYMBOLS = frozenset('!@#$%^&*(),.?":{}|<>')
+
+
+def character_classes(password, symbols=SYMBOLS):
+    """Retourne (minuscules, majuscules, chiffres, symboles) en un seul passage sur le mot de passe"""
+    chars = frozenset(password)
+    return (
+        not chars.isdisjoint(LOWER),
+        not chars.isdisjoint(UPPER),
+        not chars.isdisjoint(DIGITS),
+        not chars.isdisjoint(symbols),
+    )
+
+
+def random_chars(alphabet, count):
+    """
+    Tire count caractères uniformément dans alphabet (ASCII, 256 au plus) à partir
+    d'octets aléatoires tirés en bloc, avec rejet des valeurs hors alphabet
+    """
+    if not alphabet:
+        raise ValueError("L'alphabet ne peut pas être vide")
+    alphabet = alphabet.encode('ascii')
+    size = len(alphabet)
+    mask = (1 << (size - 1).bit_length()) - 1
+    out = bytearray()
+    while len(out) < count:
+        # Au moins la moitié des octets masqués sont acceptés : 2 x le besoin suffit en général
+        for byte in secrets.token_bytes(2 * (count - len(out))):
+            value = byte & mask
+            if value < size:
+                out.append(alphabet[value])
+                if len(out) == count:
+                    break
+    return out.decode('ascii')
+
+
+def _last_used_bucket(dt, now):
+    """Retourne (texte, couleur) décrivant l'ancienneté de la dernière utilisation"""
+    if not dt:
+        return "Jamais utilisé", '#6c757d'
+    
+    days = (now - dt).days
+    if days == 0:
+        return "Aujourd'hui", '#28a745'
+    elif days == 1:
+        return "Hier", '#28a745'
+    elif days <= 7:
+        return f"Il y a {days} jours", '#ffc107'
+    elif days <= 30:
+        return f"Il y a {days // 7} semaine(s)", '#fd7e14'
+    return f"Il y a {days // 30} mois", '#dc3545'
+
+
+def humanize_last_used(dt, now):
+    """Affichage texte de la dernière utilisation"""
+    return _last_used_bucket(dt, now)[0]
+
+
+def humanize_last_used_html(dt, now):
+    """Affichage coloré (HTML) de la dernière utilisation"""
+    text, color = _last_used_bucket(dt, now)
+    return format_html('<span style="color: {};">{}</span>', color, text)
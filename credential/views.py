@@ -4,12 +4,11 @@ Views pour la gestion des credentials avec sécurité et fonctionnalités avanc
 """
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.db.models import Q, Count, Case, When, IntegerField
-from django.http import JsonResponse
+from django.db.models import Q, Count, Case, When, IntegerField, Exists, OuterRef
+from django.db.models.functions import Length
+from django.http import JsonResponse, StreamingHttpResponse
 from django.core.exceptions import PermissionDenied
 from django.contrib.auth.decorators import login_required
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
 from django.conf import settings
 from django.core.cache import cache
 from rest_framework import viewsets, status, filters
@@ -22,21 +21,111 @@ import re
 import secrets
 import string
 import hashlib
+import hmac
+import json
+import math
 from datetime import timedelta, datetime
+from decimal import Decimal
 import logging
 from collections import Counter
-from .models import Category, Credential, PasswordHistory
+from core.utils import related_lookups
+from sharing.models import SharedCredential
+from .models import Category, Credential, PasswordHistory, PASSWORD_HISTORY_LIMIT
+from .utils import character_classes, random_chars
 from .serializers import (
     CategorySerializer,
     CredentialListSerializer,
     CredentialDetailSerializer,
     CredentialCreateSerializer,
     CredentialUpdateLastUsedSerializer,
+    PasswordGeneratorSerializer,
     PasswordHistorySerializer
 )
 
 logger = logging.getLogger(__name__)
 
+# Les identifiants mal formés sont rejetés par le résolveur d'URL, sans requête SQL
+UUID_LOOKUP_REGEX = '[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}'
+
+# Symboles reconnus par l'analyse détaillée des mots de passe
+_ANALYSIS_SYMBOLS = frozenset('!@#$%^&*(),.?":{}|<>[]\\/_+=~`-;\'§')
+
+# Motifs courants dangereux (recherchés dans le mot de passe en minuscules),
+# réunis en une seule alternative : un seul parcours du mot de passe
+_COMMON_RE = re.compile('|'.join([
+    # Séquences numériques
+    r'123+', r'234+', r'345+', r'456+', r'567+', r'678+', r'789+',
+    r'987+', r'876+', r'765+', r'654+', r'543+', r'432+', r'321+',
+
+    # Séquences alphabétiques
+    r'abc+', r'bcd+', r'cde+', r'def+', r'efg+', r'fgh+',
+    r'zyx+', r'yxw+', r'xwv+', r'wvu+', r'vut+', r'uts+',
+
+    # Motifs de clavier
+    r'qwer+', r'asdf+', r'zxcv+', r'qwerty+', r'azerty+',
+    r'uiop+', r'hjkl+', r'nm,+', r'./;+',
+
+    # Mots courants
+    r'password+', r'motdepasse+', r'admin+', r'user+', r'login+',
+    r'welcome+', r'bonjour+', r'salut+', r'test+', r'demo+',
+
+    # Dates courantes
+    r'202[0-9]', r'199[0-9]', r'198[0-9]',
+
+    # Répétitions
+    r'(.)\1{2,}',  # 3+ caractères identiques consécutifs (seul groupe capturant)
+]))
+
+# Longueur maximale analysée (protège l'analyse contre des entrées démesurées)
+MAX_ANALYZED_PASSWORD_LENGTH = 1024
+
+# Mots courants français et anglais (4 caractères ou plus)
+_DICTIONARY_WORDS = tuple(word for word in [
+    'password', 'motdepasse', 'admin', 'user', 'login', 'welcome',
+    'bonjour', 'salut', 'hello', 'world', 'test', 'demo', 'azerty',
+    'qwerty', 'secret', 'passe', 'code', 'clef', 'key', 'open',
+    'ouvrir', 'fermer', 'close', 'start', 'stop', 'begin', 'end',
+    'premier', 'dernier', 'first', 'last', 'nouveau', 'new', 'old',
+    'ancien', 'facile', 'easy', 'simple', 'basic', 'master', 'maitre'
+] if len(word) >= 4)
+
+# Recherche multi-mots en un seul parcours : l'assertion avant (?=...) teste
+# chaque position, les occurrences qui se chevauchent sont donc toutes trouvées
+# (motdepasse et passe). Un seul mot par position : aucun mot de la liste ne
+# doit être le préfixe d'un autre
+_DICTIONARY_RE = re.compile('(?=(%s))' % '|'.join(map(re.escape, _DICTIONARY_WORDS)))
+
+_DICTIONARY_ADVICE = 'Éviter les mots du dictionnaire'
+
+
+def _cacheable_strength(result):
+    """
+    Copie de l'analyse sans fragment du mot de passe en clair (mots du
+    dictionnaire trouvés) : seule forme stockée dans le cache partagé
+    """
+    analysis = dict(result['analysis'])
+    analysis['has_dictionary_words'] = bool(analysis.pop('dictionary_words'))
+    recommendations = [
+        _DICTIONARY_ADVICE if advice.startswith(_DICTIONARY_ADVICE) else advice
+        for advice in result['recommendations']
+    ]
+    return {**result, 'analysis': analysis, 'recommendations': recommendations}
+
+
+# Durée de vie des statistiques du tableau de bord : borne aussi la fraîcheur
+# des compteurs basés sur la date (mots de passe anciens, activité récente)
+DASHBOARD_STATS_TIMEOUT = 120
+
+
+def dashboard_stats_cache_key(user_id):
+    """Clé de cache des statistiques du tableau de bord d'un utilisateur"""
+    return f'dashboard_stats_{user_id}'
+
+
+def invalidate_dashboard_stats(user_id):
+    """Supprime les statistiques en cache après une modification des credentials"""
+    cache.delete(dashboard_stats_cache_key(user_id))
+
 
 class StandardResultsSetPagination(PageNumberPagination):
     """Pagination personnalisée pour les credentials"""
@@ -49,6 +138,7 @@ class CategoryViewSet(viewsets.ModelViewSet):
     """ViewSet pour les catégories"""
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticated]
+    lookup_value_regex = UUID_LOOKUP_REGEX
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name']
     ordering_fields = ['name', 'created_at', 'credential_count']
@@ -57,23 +147,34 @@ class CategoryViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Retourne toutes les catégories avec comptage des credentials de l'utilisateur"""
         return Category.objects.annotate(
-            user_credential_count=Count(
+            credential_count=Count(
                 'credential',
                 filter=Q(credential__owner=self.request.user)
             )
-        ).distinct()
+        )
     
     @action(detail=True, methods=['get'])
     def credentials(self, request, pk=None):
         """Retourne les credentials d'une catégorie pour l'utilisateur connecté"""
         category = self.get_object()
+        # Mêmes colonnes que la liste de CredentialViewSet : pas de blobs chiffrés
         credentials = Credential.objects.filter(
             category=category,
             owner=request.user
-        ).select_related('category', 'folder')
-        
-        serializer = CredentialListSerializer(credentials, many=True, context={'request': request})
-        return Response(serializer.data)
+        ).select_related('category', 'folder').defer(
+            'password_encrypted', 'notes_encrypted'
+        ).annotate(
+            password_length=Length('password_encrypted'),
+            notes_length=Length('notes_encrypted'),
+        ).order_by('-created_at')
+        
+        # Paginé comme la liste des credentials
+        paginator = StandardResultsSetPagination()
+        page = paginator.paginate_queryset(credentials, request, view=self)
+        serializer = CredentialListSerializer(
+            page, many=True, context={'request': request, 'now': timezone.now()}
+        )
+        return paginator.get_paginated_response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def stats(self, request):
@@ -93,6 +194,7 @@ class CategoryViewSet(viewsets.ModelViewSet):
 class CredentialViewSet(viewsets.ModelViewSet):
     """ViewSet principal pour les credentials"""
     permission_classes = [IsAuthenticated]
+    lookup_value_regex = UUID_LOOKUP_REGEX
     pagination_class = StandardResultsSetPagination
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'username', 'url']
@@ -101,16 +203,21 @@ class CredentialViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Retourne les credentials de l'utilisateur ou partagés avec lui"""
-        base_queryset = Credential.objects.select_related(
-            'category', 'folder', 'owner'
-        ).prefetch_related('password_history')
-        
-        # Credentials possédés ou partagés avec l'utilisateur
+        # Jointures déduites des champs du serializer de l'action ; le propriétaire
+        # est lu par les vérifications de permission hors liste
+        select, prefetch = related_lookups(self.get_serializer_class(), Credential)
+        if self.action != 'list':
+            select += ('owner',)
+        base_queryset = Credential.objects.select_related(*select).prefetch_related(*prefetch)
+        
+        # Credentials possédés ou partagés avec l'utilisateur. Le partage est testé
+        # par une sous-requête EXISTS : pas de jointure, donc pas de doublons
         user_credentials = Q(owner=self.request.user)
-        shared_credentials = Q(
-            shared_with__user=self.request.user,  # Partagés spécifiquement avec l'utilisateur
-            shared_with__is_active=True  # Optionnel: vérifier que le partage est actif
-        )
+        shared_credentials = Q(Exists(SharedCredential.objects.filter(
+            credential=OuterRef('pk'),
+            user=self.request.user,  # Partagés spécifiquement avec l'utilisateur
+            is_active=True  # Optionnel: vérifier que le partage est actif
+        )))
         
         queryset = base_queryset.filter(user_credentials | shared_credentials)
         
@@ -140,7 +247,21 @@ class CredentialViewSet(viewsets.ModelViewSet):
         if unused == 'true':
             queryset = queryset.filter(last_used_at__isnull=True)
         
-        return queryset.distinct()
+        if self.action == 'list':
+            # La liste n'affiche que la présence des blobs chiffrés : leur
+            # longueur est calculée en base au lieu de les transférer
+            queryset = queryset.defer('password_encrypted', 'notes_encrypted').annotate(
+                password_length=Length('password_encrypted'),
+                notes_length=Length('notes_encrypted'),
+            )
+        
+        return queryset
+    
+    def get_serializer_context(self):
+        """Ajoute l'heure courante, calculée une fois pour toutes les lignes sérialisées"""
+        context = super().get_serializer_context()
+        context['now'] = timezone.now()
+        return context
     
     def get_serializer_class(self):
         """Retourne le serializer approprié selon l'action"""
@@ -156,6 +277,7 @@ class CredentialViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         """Personnalise la création avec logs de sécurité"""
         credential = serializer.save()
+        invalidate_dashboard_stats(credential.owner_id)
         logger.info(f"Credential created: {credential.name} by {self.request.user.email}")
     
     def perform_update(self, serializer):
@@ -164,14 +286,17 @@ class CredentialViewSet(viewsets.ModelViewSet):
         if serializer.instance.owner != self.request.user and not serializer.instance.is_shared:
             raise DRFPermissionDenied("Vous n'avez pas la permission de modifier ce credential")
         
-        old_password = serializer.instance.decrypt_password()
+        # L'ancien mot de passe n'est déchiffré que s'il change réellement
+        new_password = serializer.validated_data.get('password')
+        old_password = None
+        if new_password and not serializer.instance.password_matches(new_password):
+            old_password = serializer.instance.decrypt_password()
         credential = serializer.save()
+        invalidate_dashboard_stats(credential.owner_id)
         
         # Si le mot de passe a changé, sauvegarder l'ancien dans l'historique
-        if 'password' in serializer.validated_data:
-            new_password = serializer.validated_data['password']
-            if new_password and new_password != old_password:
-                self._save_password_history(credential, old_password)
+        if old_password:
+            self._save_password_history(credential, old_password)
         
         logger.info(f"Credential updated: {credential.name} by {self.request.user.email}")
     
@@ -182,6 +307,7 @@ class CredentialViewSet(viewsets.ModelViewSet):
         
         logger.info(f"Credential deleted: {instance.name} by {self.request.user.email}")
         super().perform_destroy(instance)
+        invalidate_dashboard_stats(instance.owner_id)
     
     def _save_password_history(self, credential, old_password):
         """Sauvegarde l'ancien mot de passe dans l'historique"""
@@ -190,24 +316,19 @@ class CredentialViewSet(viewsets.ModelViewSet):
             password_hash = hashlib.sha256(old_password.encode()).hexdigest()
             
             # Éviter les doublons
-            if not PasswordHistory.objects.filter(
-                credential=credential, 
+            _, created = PasswordHistory.objects.get_or_create(
+                credential=credential,
                 password_hash=password_hash
-            ).exists():
-                PasswordHistory.objects.create(
-                    credential=credential,
-                    password_hash=password_hash
-                )
-            
-            # Limiter l'historique (garder seulement les 10 derniers)
-            history_ids = PasswordHistory.objects.filter(
-                credential=credential
-            ).order_by('-created_at').values_list('id', flat=True)[10:]
+            )
             
-            if history_ids:
-                PasswordHistory.objects.filter(id__in=history_ids).delete()
+            # Limiter l'historique (garder seulement les PASSWORD_HISTORY_LIMIT derniers) :
+            # un seul DELETE avec sous-requête, inutile si aucune entrée n'a été ajoutée
+            if created:
+                history = PasswordHistory.objects.filter(credential=credential)
+                keep_ids = history.order_by('-created_at').values('id')[:PASSWORD_HISTORY_LIMIT]
+                history.exclude(id__in=keep_ids).delete()
     
-    @action(detail=True, methods=['post'])
+    @action(detail=True, methods=['post'], url_path='mark-used', url_name='mark-used')
     def mark_used(self, request, pk=None):
         """Marque un credential comme utilisé récemment"""
         credential = self.get_object()
@@ -217,12 +338,13 @@ class CredentialViewSet(viewsets.ModelViewSet):
             raise DRFPermissionDenied("Accès refusé à ce credential")
         
         credential.update_last_used()
+        invalidate_dashboard_stats(credential.owner_id)
         logger.info(f"Credential marked as used: {credential.name} by {request.user.email}")
         
         serializer = self.get_serializer(credential)
         return Response(serializer.data)
     
-    @action(detail=True, methods=['post'])
+    @action(detail=True, methods=['post'], url_path='toggle-favorite', url_name='toggle-favorite')
     def toggle_favorite(self, request, pk=None):
         """Bascule le statut favori d'un credential"""
         credential = self.get_object()
@@ -232,11 +354,12 @@ class CredentialViewSet(viewsets.ModelViewSet):
         
         credential.is_favorite = not credential.is_favorite
         credential.save(update_fields=['is_favorite'])
+        invalidate_dashboard_stats(credential.owner_id)
         
         serializer = CredentialDetailSerializer(credential, context={'request': request})
         return Response(serializer.data)
     
-    @action(detail=True, methods=['get'])
+    @action(detail=True, methods=['get'], url_path='password-strength', url_name='password-strength')
     def password_strength(self, request, pk=None):
         """Analyse la force du mot de passe"""
         credential = self.get_object()
@@ -244,121 +367,30 @@ class CredentialViewSet(viewsets.ModelViewSet):
         if credential.owner != request.user and not credential.is_shared:
             raise DRFPermissionDenied("Accès refusé à ce credential")
         
-        password = credential.decrypt_password()
-        analysis = self._analyze_password_strength(password)
+        # Mise en cache par credential et empreinte HMAC (invalidée à chaque
+        # changement de mot de passe), ce qui évite aussi le déchiffrement.
+        # La réponse est toujours la forme expurgée, identique avec ou sans cache
+        cache_key = (
+            f'password_strength_{credential.pk}_{credential.password_tag}'
+            if credential.password_tag else None
+        )
+        analysis = cache.get(cache_key) if cache_key else None
+        if analysis is None:
+            analysis = _cacheable_strength(
+                self._analyze_password_strength(credential.decrypt_password())
+            )
+            if cache_key:
+                cache.set(cache_key, analysis, 3600)
         
         return Response(analysis)
     
-    def _analyze_password_strength(self, password):
-        """Analyse détaillée de la force d'un mot de passe"""
-        if not password:
-            return {
-                'score': 0,
-                'level': 'Aucun',
-                'recommendations': ['Définir un mot de passe']
-            }
-        
-        analysis = {
-            'length': len(password),
-            'has_lowercase': bool(re.search(r'[a-z]', password)),
-            'has_uppercase': bool(re.search(r'[A-Z]', password)),
-            'has_digits': bool(re.search(r'\d', password)),
-            'has_symbols': bool(re.search(r'[!@#$%^&*(),.?":{}|<>]', password)),
-            'has_common_patterns': self._check_common_patterns(password),
-        }
-        
-        # Calcul du score
-        score = 0
-        recommendations = []
-        
-        # Longueur
-        if analysis['length'] >= 8:
-            score += 20
-        else:
-            recommendations.append('Utiliser au moins 8 caractères')
-            
-        if analysis['length'] >= 12:
-            score += 10
-        elif analysis['length'] < 12:
-            recommendations.append('Utiliser au moins 12 caractères pour plus de sécurité')
-            
-        if analysis['length'] >= 16:
-            score += 10
-        
-        # Types de caractères
-        if analysis['has_lowercase']:
-            score += 10
-        else:
-            recommendations.append('Ajouter des lettres minuscules')
-            
-        if analysis['has_uppercase']:
-            score += 10
-        else:
-            recommendations.append('Ajouter des lettres majuscules')
-            
-        if analysis['has_digits']:
-            score += 15
-        else:
-            recommendations.append('Ajouter des chiffres')
-            
-        if analysis['has_symbols']:
-            score += 25
-        else:
-            recommendations.append('Ajouter des caractères spéciaux')
-        
-        # Pénalités
-        if analysis['has_common_patterns']:
-            score -= 20
-            recommendations.append('Éviter les motifs courants (123, abc, qwerty)')
-        
-        # Niveau
-        if score >= 80:
-            level = 'Très fort'
-        elif score >= 60:
-            level = 'Fort'
-        elif score >= 40:
-            level = 'Moyen'
-        elif score >= 20:
-            level = 'Faible'
-        else:
-            level = 'Très faible'
-        
-        return {
-            'score': max(0, min(100, score)),
-            'level': level,
-            'analysis': analysis,
-            'recommendations': recommendations
-        }
-    
-    def _check_common_patterns(self, password):
-        """Vérifie la présence de motifs courants"""
-        import re
-        common_patterns = [
-            r'123', r'abc', r'qwerty', r'azerty', r'password',
-            r'admin', r'user', r'login', r'welcome'
-        ]
-        
-        password_lower = password.lower()
-        return any(re.search(pattern, password_lower) for pattern in common_patterns)
-    
-    @action(detail=False, methods=['post'])
+    @action(detail=False, methods=['post'], url_path='generate-password', url_name='generate-password')
     def generate_password(self, request):
         """Génère un mot de passe sécurisé"""
-        length = int(request.data.get('length', 16))
-        include_symbols = request.data.get('include_symbols', True)
-        include_numbers = request.data.get('include_numbers', True)
-        include_uppercase = request.data.get('include_uppercase', True)
-        include_lowercase = request.data.get('include_lowercase', True)
-        exclude_ambiguous = request.data.get('exclude_ambiguous', False)
-        
-        # Validation
-        if length < 4 or length > 128:
-            raise ValidationError("La longueur doit être entre 4 et 128 caractères")
-        
-        password = self._generate_secure_password(
-            length, include_symbols, include_numbers, 
-            include_uppercase, include_lowercase, exclude_ambiguous
-        )
+        options = PasswordGeneratorSerializer(data=request.data)
+        options.is_valid(raise_exception=True)
+        
+        password = self._generate_secure_password(**options.validated_data)
         
         analysis = self._analyze_password_strength(password)
         
@@ -402,30 +434,40 @@ class CredentialViewSet(viewsets.ModelViewSet):
         if not characters:
             raise ValidationError("Au moins un type de caractère doit être sélectionné")
         
-        # Générer le reste du mot de passe
+        # Générer le reste du mot de passe (un seul tirage d'octets aléatoires)
         remaining_length = max(0, length - len(required_chars))
-        random_chars = [secrets.choice(characters) for _ in range(remaining_length)]
+        all_chars = required_chars + list(random_chars(characters, remaining_length))
         
         # Mélanger tous les caractères
-        all_chars = required_chars + random_chars
         secrets.SystemRandom().shuffle(all_chars)
         
         return ''.join(all_chars)
     
-    @action(detail=False, methods=['get'])
+    @action(detail=False, methods=['get'], url_path='dashboard-stats', url_name='dashboard-stats')
     def dashboard_stats(self, request):
-        """Statistiques pour le tableau de bord"""
-        user_credentials = Credential.objects.filter(owner=request.user)
-        
-        total_count = user_credentials.count()
-        
-        # Statistiques de sécurité
-        weak_passwords = user_credentials.filter(password_strength__lt=60).count()
-        old_passwords = user_credentials.filter(
-            password_changed_at__lt=timezone.now() - timedelta(days=90)
-        ).count()
-        unused_credentials = user_credentials.filter(last_used_at__isnull=True).count()
-        favorites_count = user_credentials.filter(is_favorite=True).count()
+        """Statistiques pour le tableau de bord (en cache, invalidées à chaque écriture)"""
+        cache_key = dashboard_stats_cache_key(request.user.pk)
+        stats = cache.get(cache_key)
+        if stats is None:
+            stats = self._compute_dashboard_stats(request.user)
+            cache.set(cache_key, stats, DASHBOARD_STATS_TIMEOUT)
+        return Response(stats)
+    
+    def _compute_dashboard_stats(self, user):
+        """Calcule les statistiques : compteurs en un seul agrégat conditionnel"""
+        user_credentials = Credential.objects.filter(owner=user)
+        now = timezone.now()
+        
+        counts = user_credentials.aggregate(
+            total=Count('id'),
+            # Statistiques de sécurité
+            weak=Count('id', filter=Q(password_strength__lt=60)),
+            old=Count('id', filter=Q(password_changed_at__lt=now - timedelta(days=90))),
+            unused=Count('id', filter=Q(last_used_at__isnull=True)),
+            favorites=Count('id', filter=Q(is_favorite=True)),
+            # Activité récente (derniers 30 jours)
+            recent=Count('id', filter=Q(last_used_at__gte=now - timedelta(days=30))),
+        )
         
         # Répartition par catégorie
         categories_stats = user_credentials.values(
@@ -434,23 +476,18 @@ class CredentialViewSet(viewsets.ModelViewSet):
             count=Count('id')
         ).order_by('-count')
         
-        # Activité récente (derniers 30 jours)
-        recent_activity = user_credentials.filter(
-            last_used_at__gte=timezone.now() - timedelta(days=30)
-        ).count()
-        
-        return Response({
-            'total_credentials': total_count,
-            'weak_passwords': weak_passwords,
-            'old_passwords': old_passwords,
-            'unused_credentials': unused_credentials,
-            'favorites': favorites_count,
-            'recent_activity': recent_activity,
+        return {
+            'total_credentials': counts['total'],
+            'weak_passwords': counts['weak'],
+            'old_passwords': counts['old'],
+            'unused_credentials': counts['unused'],
+            'favorites': counts['favorites'],
+            'recent_activity': counts['recent'],
             'categories_distribution': list(categories_stats),
             'security_score': self._calculate_security_score(
-                total_count, weak_passwords, old_passwords, unused_credentials
+                counts['total'], counts['weak'], counts['old'], counts['unused']
             )
-        })
+        }
     
     def _calculate_security_score(self, total, weak, old, unused):
         """Calcule un score de sécurité global"""
@@ -469,37 +506,46 @@ class CredentialViewSet(viewsets.ModelViewSet):
         
         return max(0, min(100, int(score)))
     
-    @action(detail=False, methods=['get'])
+    @action(detail=False, methods=['get'], url_path='export', url_name='export')
     def export_data(self, request):
-        """Exporte les données utilisateur (sans mots de passe)"""
-        credentials = Credential.objects.filter(owner=request.user).select_related('category')
-        
-        export_data = []
-        for credential in credentials:
-            export_data.append({
-                'name': credential.name,
-                'username': credential.username,
-                'url': credential.url,
-                'category': credential.category.name if credential.category else None,
-                'notes': credential.decrypt_notes(),
-                'created_at': credential.created_at.isoformat(),
-                'last_used_at': credential.last_used_at.isoformat() if credential.last_used_at else None,
-            })
+        """Exporte les données utilisateur (sans mots de passe), en flux"""
+        rows = Credential.objects.filter(owner=request.user).values_list(
+            'name', 'username', 'url', 'category__name', 'notes_encrypted',
+            'created_at', 'last_used_at', named=True
+        ).iterator(chunk_size=2000)
         
         logger.info(f"Data exported by {request.user.email}")
         
-        return Response({
-            'export_date': timezone.now().isoformat(),
-            'total_credentials': len(export_data),
-            'credentials': export_data
-        })
+        return StreamingHttpResponse(
+            self._stream_export(rows, timezone.now()),
+            content_type='application/json'
+        )
+    
+    def _stream_export(self, rows, export_date):
+        """Produit le JSON de l'export ligne par ligne (mémoire constante)"""
+        # Instance unique, non sauvegardée, réutilisée pour déchiffrer les notes
+        holder = Credential()
+        total = 0
+        yield '{"export_date":%s,"credentials":[' % json.dumps(export_date.isoformat())
+        for row in rows:
+            holder.notes_encrypted = row.notes_encrypted
+            yield (',' if total else '') + json.dumps({
+                'name': row.name,
+                'username': row.username,
+                'url': row.url,
+                'category': row.category__name,
+                'notes': holder.decrypt_notes(),
+                'created_at': row.created_at.isoformat(),
+                'last_used_at': row.last_used_at.isoformat() if row.last_used_at else None,
+            }, ensure_ascii=False)
+            total += 1
+        yield '],"total_credentials":%d}' % total
 
     # action pour renvoyer le mot de passe du credential en clair
-    @action(detail=True, methods=['get'])
+    @action(detail=True, methods=['get'], url_path='reveal-password', url_name='reveal-password')
     def reveal_password(self, request, pk=None):
         """Retourne le mot de passe en clair d'un credential"""
         credential = self.get_object()
-        print(credential.decrypt_password())
         
         if credential.owner != request.user and not credential.is_shared:
             raise DRFPermissionDenied("Accès refusé à ce credential")
@@ -511,7 +557,7 @@ class CredentialViewSet(viewsets.ModelViewSet):
         
         return Response({'password': password})
 
-    @action(detail=False, methods=['post'], url_path='analyze-password')
+    @action(detail=False, methods=['post'], url_path='analyze-password', url_name='analyze')
     def analyze_password(self, request):
         """
         Analyse la force d'un mot de passe sans le stocker
@@ -524,6 +570,13 @@ class CredentialViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        # Refusé avant tout calcul (hash compris) : borne le coût par requête
+        if len(password) > MAX_ANALYZED_PASSWORD_LENGTH:
+            return Response(
+                {'error': f'Le mot de passe est trop long ({MAX_ANALYZED_PASSWORD_LENGTH} caractères maximum)'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
         # Créer un hash pour la mise en cache (sans exposer le mot de passe)
         password_hash = hashlib.sha256(password.encode()).hexdigest()[:16]
         cache_key = f'password_analysis_{password_hash}'
@@ -544,6 +597,8 @@ class CredentialViewSet(viewsets.ModelViewSet):
         """
         Analyse complète de la force d'un mot de passe
         """
+        # Au-delà, les caractères supplémentaires ne changent plus le résultat
+        password = password[:MAX_ANALYZED_PASSWORD_LENGTH]
         if not password:
             return {
                 'score': 0,
@@ -562,16 +617,21 @@ class CredentialViewSet(viewsets.ModelViewSet):
                 'recommendations': ['Définir un mot de passe']
             }
 
+        # Classes de caractères et fréquences calculées une seule fois
+        has_lower, has_upper, has_digit, has_symbol = character_classes(password, _ANALYSIS_SYMBOLS)
+        char_counts = Counter(password)
+        password_length = len(password)
+
         # Analyse de base
         analysis = {
-            'length': len(password),
-            'has_lowercase': bool(re.search(r'[a-z]', password)),
-            'has_uppercase': bool(re.search(r'[A-Z]', password)),
-            'has_digits': bool(re.search(r'\d', password)),
-            'has_symbols': bool(re.search(r'[!@#$%^&*(),.?":{}|<>[\]\\/_+=~`\-;\'§]', password)),
+            'length': password_length,
+            'has_lowercase': has_lower,
+            'has_uppercase': has_upper,
+            'has_digits': has_digit,
+            'has_symbols': has_symbol,
             'has_common_patterns': self._check_common_patterns(password),
-            'entropy': self._calculate_entropy(password),
-            'uniqueness': self._calculate_uniqueness(password),
+            'entropy': self._calculate_entropy(char_counts, password_length),
+            'uniqueness': self._calculate_uniqueness(char_counts, password_length),
             'dictionary_words': self._check_dictionary_words(password),
             'repeated_chars': self._check_repeated_chars(password),
             'sequential_chars': self._check_sequential_chars(password),
@@ -658,7 +718,7 @@ class CredentialViewSet(viewsets.ModelViewSet):
 
         if analysis['dictionary_words']:
             penalties += 15
-            recommendations.append(f'Éviter les mots du dictionnaire: {", ".join(analysis["dictionary_words"][:3])}')
+            recommendations.append(f'{_DICTIONARY_ADVICE}: {", ".join(analysis["dictionary_words"][:3])}')
 
         if analysis['repeated_chars'] > 2:
             penalties += 10
@@ -719,82 +779,29 @@ class CredentialViewSet(viewsets.ModelViewSet):
     def _check_common_patterns(self, password):
         """Vérifie les motifs courants dangereux"""
         password_lower = password.lower()
+        return _COMMON_RE.search(password_lower) is not None
 
-        common_patterns = [
-            # Séquences numériques
-            r'123+', r'234+', r'345+', r'456+', r'567+', r'678+', r'789+',
-            r'987+', r'876+', r'765+', r'654+', r'543+', r'432+', r'321+',
-
-            # Séquences alphabétiques  
-            r'abc+', r'bcd+', r'cde+', r'def+', r'efg+', r'fgh+',
-            r'zyx+', r'yxw+', r'xwv+', r'wvu+', r'vut+', r'uts+',
-
-            # Motifs de clavier
-            r'qwer+', r'asdf+', r'zxcv+', r'qwerty+', r'azerty+',
-            r'uiop+', r'hjkl+', r'nm,+', r'./;+',
-
-            # Mots courants
-            r'password+', r'motdepasse+', r'admin+', r'user+', r'login+',
-            r'welcome+', r'bonjour+', r'salut+', r'test+', r'demo+',
-
-            # Dates courantes
-            r'202[0-9]', r'199[0-9]', r'198[0-9]',
-
-            # Répétitions
-            r'(.)\1{2,}',  # 3+ caractères identiques consécutifs
-        ]
-
-        return any(re.search(pattern, password_lower) for pattern in common_patterns)
-
-    def _calculate_entropy(self, password):
-        """Calcule l'entropie du mot de passe"""
-        if not password:
+    def _calculate_entropy(self, char_counts, password_length):
+        """Calcule l'entropie de Shannon à partir des fréquences des caractères"""
+        if not password_length:
             return 0
 
-        # Compter la fréquence de chaque caractère
-        char_counts = Counter(password)
-        password_length = len(password)
-
-        # Calculer l'entropie de Shannon
-        entropy = 0
-        import math
-        for count in char_counts.values():
-            probability = count / password_length
-            if probability > 0:
-                entropy -= probability * math.log2(probability)
-
-        return entropy
+        return sum(
+            (count / password_length) * math.log2(password_length / count)
+            for count in char_counts.values()
+        )
 
-    def _calculate_uniqueness(self, password):
+    def _calculate_uniqueness(self, char_counts, password_length):
         """Calcule le ratio de caractères uniques"""
-        if not password:
+        if not password_length:
             return 0
 
-        unique_chars = len(set(password))
-        total_chars = len(password)
-
-        return unique_chars / total_chars
+        return len(char_counts) / password_length
 
     def _check_dictionary_words(self, password):
         """Vérifie la présence de mots du dictionnaire courants"""
-        password_lower = password.lower()
-
-        # Liste de mots courants français et anglais
-        common_words = [
-            'password', 'motdepasse', 'admin', 'user', 'login', 'welcome',
-            'bonjour', 'salut', 'hello', 'world', 'test', 'demo', 'azerty',
-            'qwerty', 'secret', 'passe', 'code', 'clef', 'key', 'open',
-            'ouvrir', 'fermer', 'close', 'start', 'stop', 'begin', 'end',
-            'premier', 'dernier', 'first', 'last', 'nouveau', 'new', 'old',
-            'ancien', 'facile', 'easy', 'simple', 'basic', 'master', 'maitre'
-        ]
-
-        found_words = []
-        for word in common_words:
-            if len(word) >= 4 and word in password_lower:
-                found_words.append(word)
-
-        return found_words
+        found = {match.group(1) for match in _DICTIONARY_RE.finditer(password.lower())}
+        return [word for word in _DICTIONARY_WORDS if word in found]
 
     def _check_repeated_chars(self, password):
         """Compte les caractères répétés consécutifs"""
@@ -858,74 +865,86 @@ class CredentialViewSet(viewsets.ModelViewSet):
             return {'online': 'Instantané', 'offline': 'Instantané'}
 
         # Calculer l'espace de clés approximatif
-        charset_size = 0
-        if re.search(r'[a-z]', password):
-            charset_size += 26
-        if re.search(r'[A-Z]', password):
-            charset_size += 26  
-        if re.search(r'\d', password):
-            charset_size += 10
-        if re.search(r'[!@#$%^&*(),.?":{}|<>[\]\\/_+=~`\-;\'§]', password):
-            charset_size += 32
+        has_lower, has_upper, has_digit, has_symbol = character_classes(password, _ANALYSIS_SYMBOLS)
+        charset_size = 26 * has_lower + 26 * has_upper + 10 * has_digit + 32 * has_symbol
 
         if charset_size == 0:
             return {'online': 'Instantané', 'offline': 'Instantané'}
 
-        # Nombre de combinaisons possibles
+        # Nombre de combinaisons possibles (entier exact : pas de dépassement
+        # de capacité des flottants pour les mots de passe longs)
         combinations = charset_size ** len(password)
 
         # Temps moyens (la moitié de l'espace)
-        avg_combinations = combinations / 2
+        avg_combinations = combinations // 2
 
         # Vitesses approximatives (tentatives par seconde)
         online_speed = 1000  # Attaque en ligne avec limitations
-        offline_speed = 1e9  # Attaque hors ligne avec GPU
+        offline_speed = 10 ** 9  # Attaque hors ligne avec GPU
 
         # Calculer les temps
-        online_seconds = avg_combinations / online_speed
-        offline_seconds = avg_combinations / offline_speed
+        online_seconds = avg_combinations // online_speed
+        offline_seconds = avg_combinations // offline_speed
+
+        def format_number(number):
+            return number if number < 10 ** 15 else f"{Decimal(number):.2e}"
 
         def format_time(seconds):
             if seconds < 1:
                 return "Instantané"
             elif seconds < 60:
-                return f"{int(seconds)} secondes"
+                return f"{seconds} secondes"
             elif seconds < 3600:
-                return f"{int(seconds/60)} minutes"
+                return f"{seconds // 60} minutes"
             elif seconds < 86400:
-                return f"{int(seconds/3600)} heures"
+                return f"{seconds // 3600} heures"
             elif seconds < 31536000:
-                return f"{int(seconds/86400)} jours"
+                return f"{seconds // 86400} jours"
             else:
-                return f"{int(seconds/31536000)} années"
+                return f"{format_number(seconds // 31536000)} années"
 
         return {
             'online': format_time(online_seconds),
             'offline': format_time(offline_seconds),
-            'combinations': int(combinations) if combinations < 1e15 else f"{combinations:.2e}"
+            'combinations': format_number(combinations)
         }
 
-
-@method_decorator(cache_page(60 * 15), name='dispatch')  # Cache 15 minutes
 class PasswordHistoryViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet pour l'historique des mots de passe (lecture seule)"""
     serializer_class = PasswordHistorySerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        credential_id = self.kwargs.get('pk')
+        # Identifiant du credential parent fourni par le NestedDefaultRouter
+        credential_id = self.kwargs.get('credential_pk')
         if credential_id:
-            credential = get_object_or_404(Credential, id=credential_id)
+            credential = get_object_or_404(
+                Credential.objects.only('id', 'owner_id', 'is_shared'), id=credential_id
+            )
             
-            # Vérifier les permissions
-            if credential.owner != self.request.user and not credential.is_shared:
+            # Vérifier les permissions (owner_id : pas de requête sur l'utilisateur)
+            if credential.owner_id != self.request.user.pk and not credential.is_shared:
                 raise DRFPermissionDenied("Accès refusé à cet historique")
             
-            return PasswordHistory.objects.filter(credential=credential).order_by('-created_at')
+            # Seules les colonnes lues par PasswordHistorySerializer
+            return PasswordHistory.objects.filter(credential_id=credential.id).only(
+                'id', 'created_at'
+            ).order_by('-created_at')
         
         return PasswordHistory.objects.none()
 
 
+def _suffix_in_range(suffix, range_lines):
+    """
+    Cherche un suffixe SHA-1 dans une réponse range (lignes "SUFFIXE:COMPTE")
+    en temps constant : comparaison hmac et parcours complet de la liste
+    """
+    found = 0
+    for line in range_lines:
+        found |= hmac.compare_digest(suffix.encode(), line.partition(':')[0].strip().upper().encode())
+    return bool(found)
+
+
 # Views utilitaires pour des actions spécifiques
 @login_required
 def check_password_breach(request, credential_id):
@@ -937,13 +956,14 @@ def check_password_breach(request, credential_id):
         if not password:
             return JsonResponse({'is_breached': False, 'message': 'Aucun mot de passe'})
         
-        # Ici vous pouvez intégrer une API comme HaveIBeenPwned
-        # Pour cet exemple, on simule la vérification
-        import hashlib
+        # Ici vous pouvez intégrer une API comme HaveIBeenPwned (k-anonymat) :
+        # seul le préfixe du hash est envoyé, le suffixe est comparé localement
         password_hash = hashlib.sha1(password.encode()).hexdigest().upper()
+        prefix, suffix = password_hash[:5], password_hash[5:]
         
-        # Simulation - en réalité, vous appelleriez l'API HaveIBeenPwned
-        is_breached = False  # Remplacer par l'appel réel à l'API
+        # Simulation - en réalité, range_lines = réponse de GET /range/{prefix}
+        range_lines = []
+        is_breached = _suffix_in_range(suffix, range_lines)
         
         return JsonResponse({
             'is_breached': is_breached,